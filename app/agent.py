@@ -1,70 +1,297 @@
+import hashlib
 import json
 import re
-from typing import Tuple
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+from rich import print as rprint
+from .matcher import TermMatcher
+from .metrics import LLM_ERRORS, LLM_SECONDS, LLM_TOKENS
 from .models import Job
+from .scorecache import ScoreCache, cache_key
 from .settings import settings
 
-try:
-    from openai import OpenAI
-except Exception:  # pragma: no cover
-    OpenAI = None  # type: ignore
+# Bump whenever the scoring prompt changes so cached scores from the old prompt are not reused.
+PROMPT_VERSION = "2"
+# The only Job fields the LLM sees: the posting itself, never the user's status/notes or derived scores.
+PROMPT_FIELDS = ("title", "company", "location", "via", "posted_at", "source", "salary", "description",
+                 "assessment_flag", "assessment_terms")
+
+SINGLE_MAX_TOKENS = 200
+BATCH_TOKENS_PER_JOB = 120
+FENCE_PAT = re.compile(r"^```(?:json)?\s*|\s*```$", re.I)
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def _parse_json(txt: str):
+    return json.loads(FENCE_PAT.sub("", txt.strip()))
+
+
+def _parse_batch(txt: str, n: int) -> Dict[int, Tuple[float, str]]:
+    data = _parse_json(txt)
+    if not isinstance(data, list):
+        return {}
+    out: Dict[int, Tuple[float, str]] = {}
+    for item in data:
+        try:
+            i = int(item["i"])
+            if 0 <= i < n:
+                out[i] = (float(item.get("score", 0)), str(item.get("blurb", ""))[:220])
+        except Exception:
+            continue
+    return out
+
+
+class TokenBudget:
+    """Per-run LLM spend cap in tokens. A limit <= 0 means unlimited."""
+
+    def __init__(self, limit: int = 0):
+        self.limit = limit
+        self.used = 0
+        self.exhausted = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "TokenBudget":
+        limits = []
+        if settings.LLM_RUN_TOKEN_BUDGET > 0:
+            limits.append(settings.LLM_RUN_TOKEN_BUDGET)
+        if settings.LLM_RUN_COST_BUDGET > 0 and settings.LLM_COST_PER_1K_TOKENS > 0:
+            limits.append(int(settings.LLM_RUN_COST_BUDGET / settings.LLM_COST_PER_1K_TOKENS * 1000))
+        return cls(min(limits) if limits else 0)
+
+    def reserve(self, tokens: int) -> bool:
+        with self._lock:
+            if self.exhausted:
+                return False
+            if self.limit > 0 and self.used + tokens > self.limit:
+                # Stop admitting work for the rest of the run instead of squeezing in smaller jobs later.
+                self.exhausted = True
+                return False
+            self.used += tokens
+            return True
+
+    def settle(self, reserved: int, actual: int) -> None:
+        with self._lock:
+            self.used += actual - reserved
+
+
+def _posting(job: Job) -> Dict[str, object]:
+    return job.model_dump(include=set(PROMPT_FIELDS))
+
+
+def prompt_version() -> str:
+    # The profile is part of the prompt, so editing CANDIDATE_PROFILE also invalidates cached scores.
+    profile_hash = hashlib.sha256(settings.CANDIDATE_PROFILE.encode("utf-8")).hexdigest()[:8]
+    return f"{PROMPT_VERSION}-{profile_hash}"
+
+
+def _client_args() -> Dict[str, str] | None:
+    if settings.LLM_API_BASE:
+        return {"api_key": settings.LLM_API_KEY or "not-needed", "base_url": settings.LLM_API_BASE}
+    if settings.LLM_API_KEY:
+        return {"api_key": settings.LLM_API_KEY}
+    if settings.OPENAI_API_KEY:
+        return {"api_key": settings.OPENAI_API_KEY}
+    if settings.OPENROUTER_API_KEY:
+        return {"api_key": settings.OPENROUTER_API_KEY, "base_url": "https://openrouter.ai/api/v1"}
+    return None
+
 
 class LLMScorer:
-    def __init__(self):
+    def __init__(self, cache: ScoreCache | None = None):
         self.enabled = False
         self.client = None
         self.model = settings.LLM_MODEL
-        if not OpenAI:
+        self.prompt_version = prompt_version()
+        self.cache = cache
+        args = _client_args()
+        if not args:
             return
+        # openai takes most of a second to import, so it is only loaded once an endpoint is configured.
+        try:
+            from openai import OpenAI
+        except Exception:  # pragma: no cover
+            return
+        self.client = OpenAI(**args)
+        self.enabled = True
 
-        if settings.LLM_API_BASE:
-            api_key = settings.LLM_API_KEY or "not-needed"
-            self.client = OpenAI(api_key=api_key, base_url=settings.LLM_API_BASE)
-            self.enabled = True
-        elif settings.LLM_API_KEY:
-            self.client = OpenAI(api_key=settings.LLM_API_KEY)
-            self.enabled = True
-        elif settings.OPENAI_API_KEY:
-            self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
-            self.enabled = True
-        elif settings.OPENROUTER_API_KEY:
-            self.client = OpenAI(api_key=settings.OPENROUTER_API_KEY, base_url="https://openrouter.ai/api/v1")
-            self.enabled = True
-
-    def score_and_blurb(self, job: Job) -> Job:
-        if not self.enabled:
-            return job
-        prompt = f"""
+    def _prompt(self, job: Job) -> str:
+        return f"""
 You are evaluating a job for a senior data/analytics leader with this background:
-- 17+ years leading data science, analytics, marketing analytics (CDP, identity graph), cloud platforms, BI.
-- Seeks roles like CDO, VP/Director of Data/Analytics, Head of Data, Data Strategy/Transformation.
+{settings.CANDIDATE_PROFILE}
 Job (JSON):
-{job.model_dump_json()}
+{json.dumps(_posting(job))}
 Return JSON with:
 - score: 0-100 strategic fit
 - blurb: a single sentence for a "Why I'm a fit" field (<=220 chars, no names)
 """
+
+    def _batch_prompt(self, jobs: List[Job]) -> str:
+        items = "\n".join(json.dumps({"i": i, **_posting(job)}) for i, job in enumerate(jobs))
+        return f"""
+You are evaluating jobs for a senior data/analytics leader with this background:
+{settings.CANDIDATE_PROFILE}
+Jobs (one JSON object per line, each with an index "i"):
+{items}
+Return only a JSON array with one object per job:
+- i: the job index
+- score: 0-100 strategic fit
+- blurb: a single sentence for a "Why I'm a fit" field (<=220 chars, no names)
+"""
+
+    def _complete(self, prompt: str, max_tokens: int, call: str = "single") -> Tuple[str, int]:
+        start = time.perf_counter()
         try:
             resp = self.client.chat.completions.create(
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.2,
-                max_tokens=200,
+                max_tokens=max_tokens,
             )
-            txt = (resp.choices[0].message.content or "").strip()
-            data = json.loads(txt)
+        except Exception as exc:
+            LLM_ERRORS.inc(call=call, kind="request")
+            rprint(f"[red]LLM request failed[/red] ({call}, model={self.model}): {exc!r}")
+            raise
+        finally:
+            LLM_SECONDS.observe(time.perf_counter() - start, call=call)
+        txt = (resp.choices[0].message.content or "").strip()
+        usage = getattr(resp, "usage", None)
+        tokens = getattr(usage, "total_tokens", None) or _estimate_tokens(prompt) + max_tokens
+        LLM_TOKENS.inc(tokens, call=call)
+        return txt, tokens
+
+    def _parse_failed(self, call: str, txt: str, exc: Exception) -> None:
+        LLM_ERRORS.inc(call=call, kind="parse")
+        rprint(f"[red]Unparseable LLM reply[/red] ({call}): {exc!r}; reply starts {txt[:120]!r}")
+
+    def _score_one(self, job: Job) -> Tuple[bool, int]:
+        try:
+            txt, tokens = self._complete(self._prompt(job), SINGLE_MAX_TOKENS)
+        except Exception:
+            return False, 0
+        try:
+            data = _parse_json(txt)
             job.llm_score = float(data.get("score", 0))
             job.llm_blurb = str(data.get("blurb", ""))[:220]
-        except Exception:
+            return True, tokens
+        except Exception as exc:
             # Soft-fail: keep job as-is
-            pass
+            self._parse_failed("single", txt, exc)
+            return False, tokens
+
+    def score_and_blurb(self, job: Job) -> Job:
+        if not self.enabled:
+            return job
+        key = cache_key(job, self.model, self.prompt_version) if self.cache else None
+        if key:
+            hit = self.cache.get(key)
+            if hit:
+                job.llm_score, job.llm_blurb = hit
+                return job
+        ok, _ = self._score_one(job)
+        if ok and key:
+            self.cache.put(key, job.llm_score, job.llm_blurb)
         return job
 
-ASSESSMENT_TERMS = [t.strip().lower() for t in settings.ASSESSMENT_TERMS if t.strip()]
+    def score_many(self, jobs: List[Job], mode: str | None = None, budget: TokenBudget | None = None) -> List[Job]:
+        """Score ``jobs`` in place. ``mode`` is ``single``, ``batch`` or ``concurrent`` (default ``LLM_SCORE_MODE``).
+
+        Budget is reserved in list order, so when it runs out the unscored jobs are always the tail of
+        ``jobs``; they are returned unchanged rather than dropped.
+        """
+        if not (self.enabled and jobs):
+            return jobs
+        mode = (mode or settings.LLM_SCORE_MODE).strip().lower()
+        budget = budget or TokenBudget.from_settings()
+        pending: list[tuple[Job, str | None]] = []
+        for job in jobs:
+            key = cache_key(job, self.model, self.prompt_version) if self.cache else None
+            hit = self.cache.get(key) if key else None
+            if hit:
+                job.llm_score, job.llm_blurb = hit
+            else:
+                pending.append((job, key))
+        if mode == "batch":
+            scored = self._score_batched(pending, budget)
+        elif mode == "concurrent":
+            scored = self._score_concurrent(pending, budget)
+        else:
+            scored = self._score_sequential(pending, budget)
+        if self.cache:
+            for job, key in scored:
+                if key:
+                    self.cache.put(key, job.llm_score, job.llm_blurb)
+        return jobs
+
+    def _score_sequential(self, pending, budget: TokenBudget):
+        scored = []
+        for job, key in pending:
+            estimate = _estimate_tokens(self._prompt(job)) + SINGLE_MAX_TOKENS
+            if not budget.reserve(estimate):
+                break
+            ok, used = self._score_one(job)
+            budget.settle(estimate, used)
+            if ok:
+                scored.append((job, key))
+        return scored
+
+    def _score_concurrent(self, pending, budget: TokenBudget):
+        admitted = []
+        for job, key in pending:
+            estimate = _estimate_tokens(self._prompt(job)) + SINGLE_MAX_TOKENS
+            if not budget.reserve(estimate):
+                break
+            admitted.append((job, key, estimate))
+        scored = []
+        with ThreadPoolExecutor(max_workers=max(1, settings.LLM_CONCURRENCY)) as pool:
+            results = pool.map(lambda item: self._score_one(item[0]), admitted)
+            for (job, key, estimate), (ok, used) in zip(admitted, results):
+                budget.settle(estimate, used)
+                if ok:
+                    scored.append((job, key))
+        return scored
+
+    def _score_batched(self, pending, budget: TokenBudget):
+        scored = []
+        size = max(1, settings.LLM_BATCH_SIZE)
+        for start in range(0, len(pending), size):
+            group = pending[start:start + size]
+            batch = [job for job, _ in group]
+            prompt = self._batch_prompt(batch)
+            max_tokens = BATCH_TOKENS_PER_JOB * len(batch) + 50
+            estimate = _estimate_tokens(prompt) + max_tokens
+            if not budget.reserve(estimate):
+                break
+            txt, used, results = "", 0, {}
+            try:
+                txt, used = self._complete(prompt, max_tokens, call="batch")
+                results = _parse_batch(txt, len(batch))
+            except Exception as exc:
+                if txt:
+                    self._parse_failed("batch", txt, exc)
+            budget.settle(estimate, used)
+            retry = []
+            for i, (job, key) in enumerate(group):
+                if i in results:
+                    job.llm_score, job.llm_blurb = results[i]
+                    scored.append((job, key))
+                else:
+                    retry.append((job, key))
+            # Malformed or partial array: fall back to one request per missing job.
+            scored.extend(self._score_sequential(retry, budget))
+            if budget.exhausted:
+                break
+        return scored
+
+
+_assessment = TermMatcher(settings.ASSESSMENT_TERMS)
 
 def detect_assessment(text: str) -> Tuple[int, str]:
-    if not text:
-        return (0, "")
-    low = text.lower()
-    hits = [term for term in ASSESSMENT_TERMS if term and term in low]
-    return (1 if hits else 0, ", ".join(dict.fromkeys(hits)))
+    res = _assessment.scan(text)
+    flag = res.score >= settings.ASSESSMENT_MIN_WEIGHT and not res.negative
+    return (1 if flag else 0, ", ".join(res.positive) if flag else "")
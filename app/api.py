@@ -1,12 +1,18 @@
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import HTMLResponse
+import sqlite3
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import HTMLResponse, PlainTextResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
-from .harvest import Runner
+from rich import print as rprint
+from .context import context
+from .harvest import EXPORT_FORMATS, Exporter, configured_shards
+from .planner import QueryPlanner
+from .rescore import rescorer
+from .metrics import REGISTRY
+from .runs import run_manager
 from .settings import settings
 
 app = FastAPI()
-_runner = Runner()
 templates = Jinja2Templates(directory="app/templates")
 
 class StatusUpdate(BaseModel):
@@ -17,13 +23,105 @@ class StatusUpdate(BaseModel):
 def health():
     return {"ok": True}
 
-@app.post("/run")
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.post("/run", status_code=202)
 def run_now():
-    return _runner.run_once()
+    return run_manager.start("api")
+
+@app.get("/runs")
+def list_runs(limit: int = 20):
+    return run_manager.recent(max(1, min(limit, 200)))
+
+@app.get("/runs/{run_id}")
+def run_status(run_id: str):
+    status = run_manager.status(run_id)
+    if not status:
+        raise HTTPException(status_code=404, detail={"error": "run_not_found"})
+    return status
+
+def _list_jobs(limit: int, cursor: str | None, status: str | None, min_score: float | None,
+               assessment: bool | None, source: str | None, include_description: bool, collapse: bool = True):
+    try:
+        return context.store.list_jobs(
+            limit=max(1, min(limit, 500)), cursor=cursor, status=status, min_score=min_score,
+            assessment=assessment, source=source, include_description=include_description, collapse=collapse,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail={"error": "invalid_cursor"})
 
 @app.get("/latest")
-def latest(limit: int = 20):
-    return [j.model_dump() for j in _runner.store.latest(limit)]
+def latest(response: Response, limit: int = 20, cursor: str | None = None, status: str | None = None,
+           min_score: float | None = None, assessment: bool | None = None, source: str | None = None,
+           include_description: bool = False, collapse: bool = True):
+    jobs, next_cursor = _list_jobs(limit, cursor, status, min_score, assessment, source, include_description, collapse)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [j.model_dump() for j in jobs]
+
+@app.get("/jobs")
+def list_jobs(limit: int = 50, cursor: str | None = None, status: str | None = None,
+              min_score: float | None = None, assessment: bool | None = None, source: str | None = None,
+              include_description: bool = False, collapse: bool = True):
+    jobs, next_cursor = _list_jobs(limit, cursor, status, min_score, assessment, source, include_description, collapse)
+    return {"items": [j.model_dump() for j in jobs], "next_cursor": next_cursor}
+
+@app.post("/rescore", status_code=202)
+def rescore(all: bool = False, limit: int = 0):
+    return rescorer.start(include_unscored=all, limit=max(0, limit))
+
+@app.get("/rescore")
+def rescore_status(all: bool = False):
+    return rescorer.status(include_unscored=all)
+
+@app.get("/export")
+def export(format: str = "csv", since: str | None = None, include_description: bool = False):
+    fmt = format.strip().lower()
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail={"error": "invalid_format", "allowed": list(EXPORT_FORMATS)})
+    if fmt == "parquet" and not Exporter.parquet_available():
+        raise HTTPException(status_code=503, detail={"error": "parquet_unavailable"})
+    try:
+        cursor, chunks = Exporter.export(fmt, since, include_description)
+    except ValueError:
+        raise HTTPException(status_code=400, detail={"error": "invalid_since"})
+    return StreamingResponse(chunks, media_type=EXPORT_FORMATS[fmt], headers={
+        "X-Export-Cursor": str(cursor),
+        "Content-Disposition": f'attachment; filename="jobs_{cursor}.{fmt}"',
+    })
+
+@app.get("/plan")
+def plan():
+    return QueryPlanner(context.store.conn).report(configured_shards())
+
+@app.get("/jobs/{job_id}/description")
+def job_description(job_id: str):
+    text = context.store.description(job_id)
+    if text is None:
+        raise HTTPException(status_code=404, detail={"error": "job_not_found"})
+    return {"id": job_id, "description": text}
+
+@app.get("/jobs/{job_id}/duplicates")
+def job_duplicates(job_id: str):
+    return {"id": job_id, "items": [j.model_dump() for j in context.store.duplicates(job_id)]}
+
+@app.get("/search")
+def search(q: str, limit: int = 20, offset: int = 0, status: str | None = None, min_score: float | None = None,
+           assessment: bool | None = None, source: str | None = None, collapse: bool = True):
+    if not context.store.has_search:
+        raise HTTPException(status_code=503, detail={"error": "search_unavailable"})
+    try:
+        items = context.store.search(
+            q, limit=max(1, min(limit, 200)), offset=max(0, offset), status=status, min_score=min_score,
+            assessment=assessment, source=source, collapse=collapse,
+        )
+    except sqlite3.DatabaseError as exc:
+        # A damaged or misaligned index (e.g. rows removed outside the app, or a VACUUM without a rebuild).
+        raise HTTPException(status_code=503, detail={"error": "search_index_error", "message": str(exc),
+                                                     "fix": "python -m app.cli --rebuild-search"})
+    return {"query": q, "items": items}
 
 @app.post("/jobs/{job_id}/status")
 def update_status(job_id: str, payload: StatusUpdate):
@@ -31,7 +129,7 @@ def update_status(job_id: str, payload: StatusUpdate):
     if settings.JOB_STATUS_CHOICES and status not in settings.JOB_STATUS_CHOICES:
         raise HTTPException(status_code=400, detail={"error": "invalid_status", "allowed": settings.JOB_STATUS_CHOICES})
     try:
-        updated = _runner.store.update_status(job_id, status, payload.notes)
+        updated = context.store.update_status(job_id, status, payload.notes)
     except ValueError:
         raise HTTPException(status_code=400, detail={"error": "invalid_status", "allowed": settings.JOB_STATUS_CHOICES})
     if not updated:
@@ -40,14 +138,30 @@ def update_status(job_id: str, payload: StatusUpdate):
 
 @app.get("/", response_class=HTMLResponse)
 @app.get("/dashboard", response_class=HTMLResponse)
-def dashboard(request: Request, limit: int | None = None):
+def dashboard(request: Request, limit: int | None = None, status: str | None = None, min_score: float | None = None,
+              assessment: bool | None = None, source: str | None = None, q: str | None = None):
     page_limit = limit or settings.DASHBOARD_LIMIT
-    jobs = [j.model_dump() for j in _runner.store.latest(page_limit)]
+    jobs = None
+    if q and context.store.has_search:
+        try:
+            jobs = context.store.search(q, limit=page_limit, status=status, min_score=min_score,
+                                        assessment=assessment, source=source)
+            next_cursor = None
+        except sqlite3.DatabaseError as exc:
+            rprint(f"[yellow]Search index error ({exc}); run `python -m app.cli --rebuild-search`.[/yellow]")
+    if jobs is None:
+        jobs, next_cursor = _list_jobs(page_limit, None, status, min_score, assessment, source, False)
+        jobs = [j.model_dump() for j in jobs]
     return templates.TemplateResponse(
+        request,
         "dashboard.html",
         {
-            "request": request,
             "jobs": jobs,
+            "next_cursor": next_cursor,
+            "filters": {
+                "q": q or "", "status": status or "", "min_score": min_score, "assessment": assessment,
+                "source": source or "",
+            },
             "status_choices": settings.JOB_STATUS_CHOICES,
             "limit": page_limit,
         },
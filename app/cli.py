@@ -1,15 +1,63 @@
 import argparse
-from .harvest import Runner
+
+def export(args):
+    import sys
+    from .harvest import EXPORT_FORMATS, Exporter
+    fmt = (args.format or args.export.rsplit(".", 1)[-1]).lower()
+    if fmt not in EXPORT_FORMATS:
+        if args.format:
+            sys.exit(f"Unknown format {args.format!r}; use {', '.join(EXPORT_FORMATS)}.")
+        fmt = "csv"
+    if fmt == "parquet" and not Exporter.parquet_available():
+        sys.exit("Parquet export needs the optional pyarrow package (pip install pyarrow).")
+    try:
+        cursor, chunks = Exporter.export(fmt, args.since, args.include_description)
+    except ValueError:
+        sys.exit(f"Invalid --since {args.since!r}: pass the cursor of the previous export or an ISO timestamp.")
+    out = sys.stdout.buffer if args.export == "-" else open(args.export, "wb")
+    try:
+        for chunk in chunks:
+            out.write(chunk)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+    # Keep the cursor for the next incremental export (--since).
+    print(f"cursor: {cursor}", file=sys.stderr)
 
 def main():
     ap = argparse.ArgumentParser(description="Job harvester CLI")
     ap.add_argument("--once", action="store_true", help="Run a single cycle and exit")
+    ap.add_argument("--worker", action="store_true", help="Join runs started by other processes, forever")
+    ap.add_argument("--rebuild-search", action="store_true", help="Rebuild the full-text index (e.g. after VACUUM)")
+    ap.add_argument("--rescore", action="store_true",
+                    help="Re-score stored jobs scored by another LLM_MODEL or prompt version (resumable)")
+    ap.add_argument("--all", action="store_true", help="With --rescore, also score jobs that never got an LLM score")
+    ap.add_argument("--limit", type=int, default=0, help="With --rescore, stop after this many jobs")
+    ap.add_argument("--export", metavar="PATH", help="Stream stored jobs to PATH (csv, ndjson or parquet; - for stdout)")
+    ap.add_argument("--format", help="With --export: csv, ndjson or parquet (default: from the file extension)")
+    ap.add_argument("--since", help="With --export: cursor printed by the previous export, or an ISO created_at")
+    ap.add_argument("--include-description", action="store_true", help="With --export, add the description column")
     args = ap.parse_args()
-    r = Runner()
+    # Imported per command so `--help` and light commands skip loading the harvest pipeline.
     if args.once:
-        print(r.run_once())
+        from .runs import run_manager
+        print(run_manager.run("cli"))
+    elif args.worker:
+        from .runs import run_manager
+        run_manager.work_forever()
+    elif args.rebuild_search:
+        from .db import connect
+        conn = connect()
+        with conn:
+            conn.execute("INSERT INTO jobs_fts(jobs_fts) VALUES('rebuild')")
+        print("Search index rebuilt.")
+    elif args.export:
+        export(args)
+    elif args.rescore:
+        from .rescore import rescorer
+        print(rescorer.run(include_unscored=args.all, limit=max(0, args.limit)))
     else:
-        print("Use --once or run the FastAPI app.")
+        print("Use --once, --rescore or run the FastAPI app.")
 
 if __name__ == "__main__":
     main()
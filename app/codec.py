@@ -0,0 +1,39 @@
+import zlib
+from .settings import settings
+
+try:
+    import zstandard
+except Exception:  # pragma: no cover
+    zstandard = None  # type: ignore
+
+
+def codec() -> str:
+    """Codec for new descriptions: ``DESCRIPTION_CODEC``, with ``auto`` picking zstd when it is installed."""
+    name = settings.DESCRIPTION_CODEC.strip().lower()
+    if name == "auto":
+        return "zstd" if zstandard else "zlib"
+    if name == "zstd" and not zstandard:
+        return "zlib"
+    return name if name in ("zstd", "zlib", "none") else "zlib"
+
+
+def pack(text: str | None, name: str | None = None) -> bytes:
+    raw = (text or "").encode("utf-8")
+    name = name or codec()
+    if name == "zstd":
+        return zstandard.ZstdCompressor(level=settings.DESCRIPTION_COMPRESS_LEVEL or 3).compress(raw)
+    if name == "zlib":
+        return zlib.compress(raw, settings.DESCRIPTION_COMPRESS_LEVEL or 6)
+    return raw
+
+
+def unpack(body: bytes | None, name: str | None) -> str:
+    if body is None:
+        return ""
+    if name == "zstd":
+        if not zstandard:
+            raise RuntimeError("description stored with zstd but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(body).decode("utf-8")
+    if name == "zlib":
+        return zlib.decompress(body).decode("utf-8")
+    return bytes(body).decode("utf-8")
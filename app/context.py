@@ -0,0 +1,33 @@
+import threading
+from .harvest import Runner, Store
+
+
+class AppContext:
+    """The objects one process shares between the API, the scheduler, the run worker and the CLI.
+
+    Each is built on first use, so importing the app opens no SQLite connection and no LLM client. The API's
+    ``store`` and the ``runner`` keep separate connections: a run writes from its own thread while requests
+    are being served.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._store: Store | None = None
+        self._runner: Runner | None = None
+
+    @property
+    def store(self) -> Store:
+        with self._lock:
+            if self._store is None:
+                self._store = Store()
+            return self._store
+
+    @property
+    def runner(self) -> Runner:
+        with self._lock:
+            if self._runner is None:
+                self._runner = Runner()
+            return self._runner
+
+
+context = AppContext()
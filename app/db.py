@@ -1,5 +1,7 @@
 import sqlite3
+import time
 from pathlib import Path
+from . import codec
 from .settings import settings
 
 DDL = """
@@ -13,14 +15,127 @@ CREATE TABLE IF NOT EXISTS jobs (
   url TEXT,
   source TEXT,
   description TEXT,
+  desc_len INTEGER DEFAULT 0,
   salary TEXT,
   llm_score REAL,
   llm_blurb TEXT,
+  llm_model TEXT,
+  prompt_version TEXT,
+  local_score REAL,
+  duplicate_of TEXT,
   assessment_flag INTEGER DEFAULT 0,
   assessment_terms TEXT DEFAULT '',
   status TEXT DEFAULT 'harvested',
   notes TEXT DEFAULT '',
-  created_at TEXT
+  created_at TEXT,
+  export_seq INTEGER
+);
+CREATE TABLE IF NOT EXISTS job_descriptions (
+  job_id TEXT PRIMARY KEY,
+  codec TEXT,
+  body BLOB
+);
+CREATE TABLE IF NOT EXISTS llm_cache (
+  key TEXT PRIMARY KEY,
+  score REAL,
+  blurb TEXT,
+  created_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_created ON llm_cache(created_at);
+CREATE TABLE IF NOT EXISTS serp_cache (
+  key TEXT PRIMARY KEY,
+  engine TEXT,
+  body BLOB,
+  size INTEGER,
+  fetched_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_serp_cache_fetched ON serp_cache(fetched_at);
+CREATE TABLE IF NOT EXISTS job_signatures (
+  job_id TEXT PRIMARY KEY,
+  head INTEGER,
+  body INTEGER,
+  company TEXT,
+  city TEXT
+);
+CREATE TABLE IF NOT EXISTS runs (
+  id TEXT PRIMARY KEY,
+  trigger TEXT,
+  status TEXT,
+  owner TEXT,
+  started_at TEXT,
+  finished_at TEXT,
+  heartbeat_at REAL,
+  progress TEXT DEFAULT '{}',
+  result TEXT,
+  error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_status ON runs(status, started_at);
+CREATE TABLE IF NOT EXISTS run_metrics (
+  run_id TEXT,
+  name TEXT,
+  value REAL,
+  PRIMARY KEY (run_id, name)
+);
+CREATE TABLE IF NOT EXISTS run_items (
+  run_id TEXT,
+  shard TEXT,
+  seq INTEGER,
+  status TEXT DEFAULT 'pending',
+  found INTEGER DEFAULT 0,
+  inserted INTEGER DEFAULT 0,
+  finished_at TEXT,
+  lease_owner TEXT,
+  lease_expires REAL,
+  attempts INTEGER DEFAULT 0,
+  PRIMARY KEY (run_id, shard)
+);
+CREATE TABLE IF NOT EXISTS run_workers (
+  run_id TEXT,
+  owner TEXT,
+  joined_at TEXT,
+  heartbeat_at REAL,
+  finished_at TEXT,
+  progress TEXT DEFAULT '{}',
+  result TEXT,
+  error TEXT,
+  PRIMARY KEY (run_id, owner)
+);
+CREATE TABLE IF NOT EXISTS query_stats (
+  key TEXT PRIMARY KEY,
+  engine TEXT,
+  query TEXT,
+  location TEXT,
+  runs INTEGER DEFAULT 0,
+  results INTEGER DEFAULT 0,
+  inserted INTEGER DEFAULT 0,
+  duplicates INTEGER DEFAULT 0,
+  score_sum REAL DEFAULT 0,
+  scored INTEGER DEFAULT 0,
+  credits INTEGER DEFAULT 0,
+  recent_new REAL DEFAULT 0,
+  recent_credits REAL DEFAULT 0,
+  dead_streak INTEGER DEFAULT 0,
+  last_run_at REAL,
+  last_new_at REAL
+);
+CREATE TABLE IF NOT EXISTS serp_usage (
+  day TEXT PRIMARY KEY,
+  credits INTEGER DEFAULT 0
+);
+-- Monotonic counters that survive VACUUM and deletes (unlike rowids); 'jobs' numbers jobs.export_seq.
+CREATE TABLE IF NOT EXISTS sequences (
+  name TEXT PRIMARY KEY,
+  value INTEGER DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS rate_limits (
+  name TEXT PRIMARY KEY,
+  tokens REAL,
+  updated REAL
+);
+CREATE TABLE IF NOT EXISTS leases (
+  name TEXT PRIMARY KEY,
+  owner TEXT,
+  expires_at REAL
 );
 """
 
@@ -29,19 +144,149 @@ MIGRATIONS = [
     ("assessment_terms", "ALTER TABLE jobs ADD COLUMN assessment_terms TEXT DEFAULT ''"),
     ("status", "ALTER TABLE jobs ADD COLUMN status TEXT DEFAULT 'harvested'"),
     ("notes", "ALTER TABLE jobs ADD COLUMN notes TEXT DEFAULT ''"),
+    ("local_score", "ALTER TABLE jobs ADD COLUMN local_score REAL"),
+    ("duplicate_of", "ALTER TABLE jobs ADD COLUMN duplicate_of TEXT"),
+    # Moves inline descriptions into compressed job_descriptions rows; jobs.description is left NULL.
+    ("desc_len", [
+        "ALTER TABLE jobs ADD COLUMN desc_len INTEGER DEFAULT 0",
+        "INSERT OR IGNORE INTO job_descriptions(job_id, codec, body) "
+        "SELECT id, desc_codec(), desc_pack(description) FROM jobs WHERE COALESCE(description, '') <> ''",
+        "UPDATE jobs SET desc_len = length(COALESCE(description, '')), description = NULL",
+    ]),
+    ("llm_model", "ALTER TABLE jobs ADD COLUMN llm_model TEXT"),
+    ("prompt_version", "ALTER TABLE jobs ADD COLUMN prompt_version TEXT"),
+    # Numbered in rowid order, so export cursors handed out before the column existed stay valid.
+    ("export_seq", [
+        "ALTER TABLE jobs ADD COLUMN export_seq INTEGER",
+        "UPDATE jobs SET export_seq = rowid",
+        "INSERT OR REPLACE INTO sequences(name, value) SELECT 'jobs', COALESCE(MAX(export_seq), 0) FROM jobs",
+    ]),
 ]
 
-def connect():
-    Path(settings.DB_PATH).parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(settings.DB_PATH)
-    conn.execute("PRAGMA journal_mode=WAL;")
-    conn.execute(DDL)
-    # run simple column migrations
-    cols = {r[1] for r in conn.execute("PRAGMA table_info(jobs)").fetchall()}
-    for col, stmt in MIGRATIONS:
+RUN_ITEM_MIGRATIONS = [
+    ("lease_owner", "ALTER TABLE run_items ADD COLUMN lease_owner TEXT"),
+    ("lease_expires", "ALTER TABLE run_items ADD COLUMN lease_expires REAL"),
+    ("attempts", "ALTER TABLE run_items ADD COLUMN attempts INTEGER DEFAULT 0"),
+]
+
+RUN_WORKER_MIGRATIONS = [
+    ("error", "ALTER TABLE run_workers ADD COLUMN error TEXT"),
+]
+
+# Created after MIGRATIONS so older databases already have every indexed column.
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_llm_score ON jobs(llm_score);
+CREATE INDEX IF NOT EXISTS idx_jobs_assessment ON jobs(assessment_flag, created_at, id);
+-- Serves the default collapsed listing (duplicate_of IS NULL, newest first) and DUPLICATE_COUNT_SQL lookups.
+DROP INDEX IF EXISTS idx_jobs_duplicate;
+CREATE INDEX IF NOT EXISTS idx_jobs_duplicate_created ON jobs(duplicate_of, created_at, id);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_export_seq ON jobs(export_seq);
+CREATE INDEX IF NOT EXISTS idx_run_items_status ON run_items(run_id, status, seq);
+"""
+
+# External-content FTS index whose content is a view that decompresses descriptions on demand (snippets,
+# rebuilds). Store.upsert_many writes new rows into it; the triggers keep it in step when a job's indexed
+# columns change or the job is deleted (and drop its description with it). The view and triggers call
+# desc_unpack, so on a connection without register_functions() snippets and rebuilds fail and so do those
+# UPDATEs/DELETEs, instead of leaving the index stale. jobs has no INTEGER PRIMARY KEY, so after a VACUUM
+# run `python -m app.cli --rebuild-search` to re-align rowids.
+FTS_DDL = """
+CREATE VIEW IF NOT EXISTS jobs_fts_content AS
+  SELECT j.rowid AS doc_id, j.title, j.company, j.location, desc_unpack(d.body, d.codec) AS description
+  FROM jobs j LEFT JOIN job_descriptions d ON d.job_id = j.id;
+CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+  title, company, location, description,
+  content='jobs_fts_content', content_rowid='doc_id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS jobs_fts_sync_ad AFTER DELETE ON jobs BEGIN
+  INSERT INTO jobs_fts(jobs_fts, rowid, title, company, location, description)
+  VALUES('delete', old.rowid, old.title, old.company, old.location,
+         COALESCE((SELECT desc_unpack(body, codec) FROM job_descriptions WHERE job_id = old.id), ''));
+  DELETE FROM job_descriptions WHERE job_id = old.id;
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_fts_sync_au AFTER UPDATE OF title, company, location ON jobs BEGIN
+  INSERT INTO jobs_fts(jobs_fts, rowid, title, company, location, description)
+  VALUES('delete', old.rowid, old.title, old.company, old.location,
+         COALESCE((SELECT desc_unpack(body, codec) FROM job_descriptions WHERE job_id = old.id), ''));
+  INSERT INTO jobs_fts(rowid, title, company, location, description)
+  VALUES(new.rowid, new.title, new.company, new.location,
+         COALESCE((SELECT desc_unpack(body, codec) FROM job_descriptions WHERE job_id = new.id), ''));
+END;
+"""
+
+# The first FTS index read descriptions straight from jobs through triggers.
+LEGACY_FTS_DROP = """
+DROP TRIGGER IF EXISTS jobs_fts_ai;
+DROP TRIGGER IF EXISTS jobs_fts_ad;
+DROP TRIGGER IF EXISTS jobs_fts_au;
+DROP TABLE IF EXISTS jobs_fts;
+"""
+
+def register_functions(conn: sqlite3.Connection) -> None:
+    conn.create_function("desc_codec", 0, codec.codec)
+    conn.create_function("desc_pack", 1, codec.pack)
+    conn.create_function("desc_unpack", 2, codec.unpack)
+
+def _ensure_fts(conn: sqlite3.Connection) -> None:
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE name='jobs_fts'").fetchone()
+    if row and "jobs_fts_content" not in row[0]:
+        conn.executescript(LEGACY_FTS_DROP)
+        row = None
+    try:
+        conn.executescript(FTS_DDL)
+    except sqlite3.OperationalError:
+        # SQLite built without FTS5; /search reports itself unavailable.
+        return
+    existed = row is not None
+    if not existed:
+        # One-time backfill for databases created before the index existed.
+        conn.execute("INSERT INTO jobs_fts(jobs_fts) VALUES('rebuild')")
+        conn.commit()
+
+def _migrate(conn: sqlite3.Connection, table: str, migrations: list) -> None:
+    # simple column migrations; a list of statements runs as one transaction
+    cols = {r[1] for r in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+    for col, stmt in migrations:
         if col not in cols:
             try:
-                conn.execute(stmt)
+                conn.execute("BEGIN")
+                for s in ([stmt] if isinstance(stmt, str) else stmt):
+                    conn.execute(s)
+                conn.commit()
             except Exception:
-                pass
+                conn.rollback()
+
+def acquire_lease(conn: sqlite3.Connection, name: str, owner: str, ttl: float) -> bool:
+    """Take or renew the ``name`` lease for ``owner``; False while another owner holds an unexpired one."""
+    now = time.time()
+    row = conn.execute(
+        """
+        INSERT INTO leases(name, owner, expires_at) VALUES(?,?,?)
+        ON CONFLICT(name) DO UPDATE SET owner=excluded.owner, expires_at=excluded.expires_at
+        WHERE leases.owner = excluded.owner OR leases.expires_at < ?
+        RETURNING owner
+        """,
+        (name, owner, now + ttl, now),
+    ).fetchone()
+    conn.commit()
+    return bool(row)
+
+def release_lease(conn: sqlite3.Connection, name: str, owner: str) -> None:
+    conn.execute("DELETE FROM leases WHERE name=? AND owner=?", (name, owner))
+    conn.commit()
+
+def connect():
+    Path(settings.DB_PATH).parent.mkdir(parents=True, exist_ok=True)
+    # FastAPI runs sync endpoints on a thread pool, so the connection must not be pinned to its creating thread.
+    conn = sqlite3.connect(settings.DB_PATH, check_same_thread=False)
+    register_functions(conn)
+    conn.execute("PRAGMA journal_mode=WAL;")
+    conn.executescript(DDL)
+    _migrate(conn, "jobs", MIGRATIONS)
+    _migrate(conn, "run_items", RUN_ITEM_MIGRATIONS)
+    _migrate(conn, "run_workers", RUN_WORKER_MIGRATIONS)
+    conn.executescript(INDEXES)
+    _ensure_fts(conn)
     return conn
@@ -0,0 +1,172 @@
+import hashlib
+import re
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+from .models import Job, SNIPPET_MARKER
+
+BANDS = 4
+BAND_BITS = 64 // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+MIN_BODY_TOKENS = 50
+MIN_TITLE_OVERLAP = 0.6
+TOKEN_PAT = re.compile(r"[a-z0-9][a-z0-9+#]*")
+ABBREVIATIONS = {
+    "sr": "senior", "snr": "senior", "jr": "junior", "vp": "vice president", "svp": "senior vice president",
+    "evp": "executive vice president", "avp": "assistant vice president", "dir": "director", "mgr": "manager",
+    "mgmt": "management", "eng": "engineering", "engr": "engineer", "dev": "developer", "ops": "operations",
+    "assoc": "associate", "hd": "head", "ml": "machine learning", "bi": "business intelligence",
+}
+COMPANY_SUFFIXES = frozenset("the inc llc ltd limited corp corporation co company plc gmbh group holdings".split())
+
+
+def _tokens(text: str | None) -> List[str]:
+    return TOKEN_PAT.findall((text or "").lower())
+
+
+def normalize_title(title: str | None) -> str:
+    return " ".join(ABBREVIATIONS.get(t, t) for t in _tokens(title))
+
+
+def company_key(company: str | None) -> str:
+    return " ".join(t for t in _tokens(company) if t not in COMPANY_SUFFIXES)
+
+
+def city_key(location: str | None) -> str:
+    loc = (location or "").lower()
+    if "remote" in loc:
+        return "remote"
+    return " ".join(_tokens(loc.split(",")[0]))
+
+
+def page_text(job: Job) -> str:
+    """Scraped page text only; the SERP snippet after SNIPPET_MARKER differs per source."""
+    desc = job.description or ""
+    return desc.split(SNIPPET_MARKER)[0] if SNIPPET_MARKER in desc else ""
+
+
+def simhash(features: Iterable[str]) -> int:
+    """64-bit SimHash: every bit is the majority vote of that bit across the feature hashes."""
+    import numpy as np
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "big") for f in features],
+        dtype=np.uint64,
+    )
+    if not len(hashes):
+        return 0
+    bits = (hashes[:, None] >> np.arange(64, dtype=np.uint64)) & np.uint64(1)
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(hashes)
+    return sum(1 << i for i in np.flatnonzero(votes > 0).tolist())
+
+
+def to_signed(sig: int | None) -> int | None:
+    """SQLite integers are signed 64-bit."""
+    return sig - (1 << 64) if sig is not None and sig >= 1 << 63 else sig
+
+
+def to_unsigned(sig: int | None) -> int | None:
+    return sig + (1 << 64) if sig is not None and sig < 0 else sig
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def title_overlap(a: str, b: str) -> float:
+    sa, sb = set(a.split()), set(b.split())
+    return len(sa & sb) / len(sa | sb) if sa or sb else 0.0
+
+
+class Signature(NamedTuple):
+    job_id: str
+    head: int
+    body: int | None
+    company: str
+    city: str
+    title: str
+
+
+def head_signature(job: Job) -> Signature:
+    """Signature over the normalized title, available before scraping; company and city must match exactly."""
+    toks = normalize_title(job.title).split()
+    head = simhash(toks + [f"{a} {b}" for a, b in zip(toks, toks[1:])])
+    return Signature(job.id, head, None, company_key(job.company), city_key(job.location), " ".join(toks))
+
+
+def body_signature(job: Job) -> int | None:
+    """Signature over word 3-shingles of the scraped page, or ``None`` when there's too little text."""
+    toks = _tokens(page_text(job))
+    if len(toks) < MIN_BODY_TOKENS:
+        return None
+    # Distinct shingles, so repeated boilerplate doesn't outvote the role-specific text.
+    return simhash({" ".join(toks[i:i + 3]) for i in range(len(toks) - 2)})
+
+
+class SignatureIndex:
+    """LSH index over 64-bit signatures split into ``BANDS`` bands; only jobs sharing a band are compared.
+
+    With four 16-bit bands, any two signatures within 3 bits of each other share at least one band,
+    so candidate lookup never misses a match at the default ``max_distance``.
+    """
+
+    def __init__(self, max_distance: int = 3):
+        self.max_distance = max_distance
+        self._buckets: Dict[Tuple[str, int, int], List[str]] = {}
+        self._sigs: Dict[str, Signature] = {}
+        self._canonical: Dict[str, str] = {}
+
+    def _bands(self, kind: str, sig: int) -> Iterable[Tuple[str, int, int]]:
+        return ((kind, b, (sig >> (b * BAND_BITS)) & BAND_MASK) for b in range(BANDS))
+
+    def add(self, sig: Signature, duplicate_of: str | None = None) -> None:
+        self._sigs[sig.job_id] = sig
+        if duplicate_of:
+            self._canonical[sig.job_id] = duplicate_of
+        for band in self._bands("h", sig.head):
+            self._buckets.setdefault(band, []).append(sig.job_id)
+        if sig.body is not None:
+            for band in self._bands("b", sig.body):
+                self._buckets.setdefault(band, []).append(sig.job_id)
+
+    def set_body(self, job_id: str, body: int) -> None:
+        sig = self._sigs[job_id]._replace(body=body)
+        self._sigs[job_id] = sig
+        for band in self._bands("b", body):
+            self._buckets.setdefault(band, []).append(job_id)
+
+    def link(self, job_id: str, canonical: str) -> None:
+        self._canonical[job_id] = canonical
+
+    def canonical_of(self, job_id: str) -> str:
+        while job_id in self._canonical:
+            job_id = self._canonical[job_id]
+        return job_id
+
+    def _match(self, kind: str, value: int, sig: Signature) -> str | None:
+        if not sig.company:
+            return None
+        seen = set()
+        for band in self._bands(kind, value):
+            for cand in self._buckets.get(band, ()):
+                if cand == sig.job_id or cand in seen:
+                    continue
+                seen.add(cand)
+                other = self._sigs[cand]
+                if other.company != sig.company:
+                    continue
+                if kind == "h" and other.city != sig.city:
+                    continue
+                # Pages from one company share ATS boilerplate, so the body alone can't tell two roles apart.
+                if kind == "b" and title_overlap(other.title, sig.title) < MIN_TITLE_OVERLAP:
+                    continue
+                if hamming(value, other.head if kind == "h" else other.body) <= self.max_distance:
+                    return self.canonical_of(cand)
+        return None
+
+    def match_head(self, sig: Signature) -> str | None:
+        return self._match("h", sig.head, sig)
+
+    def match_body(self, sig: Signature) -> str | None:
+        # Same page text under a reworded title or another location is still the same posting.
+        return self._match("b", sig.body, sig) if sig.body is not None else None
+
+    def signature(self, job_id: str) -> Signature | None:
+        return self._sigs.get(job_id)
@@ -1,24 +1,89 @@
-from typing import Dict, Any, List
-from datetime import datetime
+from typing import Dict, Any, Callable, Iterable, Iterator, List, NamedTuple, Tuple
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from rich import print as rprint
 from rich.table import Table
 from .settings import settings
-from .models import Job
-from .sources import SerpGoogleJobs, SerpLinkedInJobs
-from .agent import LLMScorer, detect_assessment
-from .scrape import fetch_full_description
+from .models import Job, SNIPPET_MARKER
+from .sources import SerpGoogleJobs, SerpLinkedInJobs, count_requests
+from .agent import LLMScorer, TokenBudget, detect_assessment
+from .scrape import fetch_many
+from .matcher import TermMatcher
 from .db import connect
+from .scorecache import ScoreCache
+from .ranker import similarity
+from .serpcache import serp_cache
+from .planner import QueryPlanner, queries
+from . import codec, dedup
+from .metrics import (
+    DB_WRITE_SECONDS, JOBS_INSERTED, PLANNED_SHARDS, SEARCH_ERRORS, SEARCH_RESULTS, SEARCH_SECONDS, STAGE_SECONDS,
+)
+import base64
 import csv
+import io
+import json
+import re
+import threading
+import time
+
+# Everything the listing views need; description is only selected on request.
+LIST_COLUMNS = [
+    "id","title","company","location","via","posted_at","url","source","salary","llm_score","llm_blurb",
+    "llm_model","prompt_version","local_score","duplicate_of","desc_len","assessment_flag","assessment_terms",
+    "status","notes",
+]
+EXPORT_COLUMNS = LIST_COLUMNS + ["created_at"]
+DESCRIPTION_EXPORT_BATCH = 200
+EXPORT_FORMATS = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson",
+                  "parquet": "application/vnd.apache.parquet"}
+DUPLICATE_COUNT_SQL = "(SELECT COUNT(*) FROM jobs d WHERE d.duplicate_of = {t}.id)"
+# Descriptions live compressed in job_descriptions; jobs.description is NULL for every row.
+DESCRIPTION_SQL = "(SELECT desc_unpack(body, codec) FROM job_descriptions WHERE job_id = {t}.id)"
+# Rows whose llm_score came from the LLM (it always leaves a blurb), not just an assessment boost.
+LLM_SCORED_SQL = " AND llm_score IS NOT NULL AND (llm_blurb IS NOT NULL OR llm_model IS NOT NULL)"
+
+
+def encode_cursor(created_at: str, job_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{created_at}|{job_id}".encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        created_at, job_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 1)
+    except Exception:
+        raise ValueError("invalid cursor")
+    return created_at, job_id
+
+def parse_since(since: str | None) -> tuple[int, str | None]:
+    """An export ``since``: the cursor (an export_seq) from a previous export, or an ISO ``created_at`` lower bound."""
+    since = (since or "").strip()
+    if not since:
+        return 0, None
+    if since.isdigit():
+        return int(since), None
+    try:
+        ts = datetime.fromisoformat(since.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError("invalid since")
+    # created_at is stored as naive UTC.
+    return 0, (ts.astimezone(timezone.utc).replace(tzinfo=None) if ts.tzinfo else ts).isoformat()
+
+def fts_query(text: str) -> str:
+    """Turn free text into a safe FTS5 query: every word must match, the last one as a prefix."""
+    terms = re.findall(r"\w+", text or "")
+    if not terms:
+        return ""
+    quoted = [f'"{t}"' for t in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
 
 class Store:
     def __init__(self):
         self.conn = connect()
+        self._fts = self.has_search
 
-    def upsert(self, job: Job) -> bool:
-        cur = self.conn.cursor()
-        cur.execute("SELECT 1 FROM jobs WHERE id=?", (job.id,))
-        if cur.fetchone():
-            return False
+    def _normalize(self, job: Job) -> None:
         status = (job.status or "").strip().lower()
         choices = settings.JOB_STATUS_CHOICES
         if choices:
@@ -26,40 +91,322 @@ class Store:
                 status = choices[0]
         elif not status:
             status = "harvested"
-        notes = (job.notes or "").strip()
         job.status = status
-        job.notes = notes
-        cur.execute(
-            """
-            INSERT INTO jobs(id,title,company,location,via,posted_at,url,source,description,salary,
-                             llm_score,llm_blurb,assessment_flag,assessment_terms,status,notes,created_at)
-            VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
+        job.notes = (job.notes or "").strip()
+
+    def upsert(self, job: Job) -> bool:
+        return job.id in self.upsert_many([job])
+
+    def upsert_many(self, jobs: Iterable[Job]) -> set[str]:
+        """Insert unseen jobs in one transaction per batch and return the IDs that were actually new.
+
+        Descriptions are compressed before the write transaction opens and stored in job_descriptions. Each new
+        job takes the next ``export_seq`` from the ``sequences`` counter in the same transaction.
+        """
+        jobs = list(jobs)
+        new_ids: set[str] = set()
+        size = max(1, settings.DB_WRITE_BATCH_SIZE)
+        name = codec.codec()
+        for start in range(0, len(jobs), size):
+            batch = jobs[start:start + size]
+            packed = [codec.pack(job.description, name) if job.description else None for job in batch]
+            now = datetime.utcnow().isoformat()
+            with DB_WRITE_SECONDS.time(op="upsert"), self.conn:
+                inserted = 0
+                for job, body in zip(batch, packed):
+                    self._normalize(job)
+                    # executemany() discards RETURNING rows, so rows go one at a time inside the transaction.
+                    row = self.conn.execute(
+                        """
+                        INSERT INTO jobs(id,title,company,location,via,posted_at,url,source,desc_len,salary,
+                                         llm_score,llm_blurb,llm_model,prompt_version,local_score,duplicate_of,
+                                         assessment_flag,assessment_terms,status,notes,created_at,export_seq)
+                        VALUES(?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,
+                               COALESCE((SELECT value FROM sequences WHERE name='jobs'), 0) + ?)
+                        ON CONFLICT(id) DO NOTHING
+                        RETURNING id, rowid
+                        """,
+                        (
+                            job.id, job.title, job.company, job.location, job.via, job.posted_at, job.url, job.source,
+                            len(job.description or ""), job.salary, job.llm_score, job.llm_blurb, job.llm_model,
+                            job.prompt_version, job.local_score, job.duplicate_of, job.assessment_flag,
+                            job.assessment_terms, job.status, job.notes, now, inserted + 1,
+                        ),
+                    ).fetchone()
+                    if not row:
+                        continue
+                    inserted += 1
+                    new_ids.add(row[0])
+                    if body is not None:
+                        self.conn.execute(
+                            "INSERT OR REPLACE INTO job_descriptions(job_id, codec, body) VALUES(?,?,?)",
+                            (job.id, name, body),
+                        )
+                    if self._fts:
+                        self.conn.execute(
+                            "INSERT INTO jobs_fts(rowid, title, company, location, description) VALUES(?,?,?,?,?)",
+                            (row[1], job.title, job.company, job.location, job.description or ""),
+                        )
+                if inserted:
+                    self.conn.execute(
+                        "INSERT INTO sequences(name, value) VALUES('jobs', ?) "
+                        "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                        (inserted,),
+                    )
+        return new_ids
+
+    def description(self, job_id: str) -> str | None:
+        """Full stored description of one job (``None`` if the job does not exist)."""
+        row = self.conn.execute(
+            f"SELECT COALESCE({DESCRIPTION_SQL.format(t='jobs')}, '') FROM jobs WHERE id=?", (job_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def known_ids(self) -> set[str]:
+        cur = self.conn.cursor()
+        cur.execute("SELECT id FROM jobs")
+        return {r[0] for r in cur.fetchall()}
+
+    def load_signatures(self, window_days: int = 0) -> List[tuple[dedup.Signature, str | None]]:
+        """Stored near-duplicate signatures with each job's canonical ID, backfilling jobs that predate them.
+
+        With ``window_days``, only jobs whose canonical job was stored within that many days are returned, so a
+        role reposted later, or a new opening under the same title, is not folded into a long-gone listing.
+        """
+        missing = self.conn.execute(
+            f"SELECT id, title, company, location, {DESCRIPTION_SQL.format(t='jobs')} FROM jobs "
+            "WHERE id NOT IN (SELECT job_id FROM job_signatures)"
+        ).fetchall()
+        if missing:
+            sigs = []
+            for job_id, title, company, location, description in missing:
+                job = Job(id=job_id, title=title or "", company=company or "", location=location or "",
+                          url="", source="", description=description or "")
+                sigs.append(dedup.head_signature(job)._replace(body=dedup.body_signature(job)))
+            self.save_signatures(sigs)
+        since = (datetime.utcnow() - timedelta(days=window_days)).isoformat() if window_days > 0 else ""
+        rows = self.conn.execute(
+            "SELECT s.job_id, s.head, s.body, s.company, s.city, j.title, j.duplicate_of "
+            "FROM job_signatures s JOIN jobs j ON j.id = s.job_id LEFT JOIN jobs c ON c.id = j.duplicate_of "
+            "WHERE COALESCE(c.created_at, j.created_at, '') >= ?",
+            (since,),
+        ).fetchall()
+        return [
+            (dedup.Signature(r[0], dedup.to_unsigned(r[1]), dedup.to_unsigned(r[2]), r[3], r[4],
+                             dedup.normalize_title(r[5])), r[6])
+            for r in rows
+        ]
+
+    def save_signatures(self, sigs: Iterable[dedup.Signature]) -> None:
+        with DB_WRITE_SECONDS.time(op="signatures"), self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO job_signatures(job_id, head, body, company, city) VALUES(?,?,?,?,?)",
+                [(s.job_id, dedup.to_signed(s.head), dedup.to_signed(s.body), s.company, s.city) for s in sigs],
+            )
+
+    def duplicates(self, job_id: str) -> List[Job]:
+        """Listings linked to ``job_id`` as near-duplicates, oldest first."""
+        rows = self.conn.execute(
+            f"SELECT {','.join(LIST_COLUMNS)} FROM jobs WHERE duplicate_of=? ORDER BY created_at, id", (job_id,)
+        ).fetchall()
+        return [self._row_to_job(LIST_COLUMNS, r) for r in rows]
+
+    def _row_to_job(self, cols: List[str], row: tuple) -> Job:
+        data = dict(zip(cols, row))
+        default_status = settings.JOB_STATUS_CHOICES[0] if settings.JOB_STATUS_CHOICES else None
+        data["status"] = data.get("status") or default_status or "harvested"
+        data["notes"] = data.get("notes") or ""
+        return Job(**{k: v for k, v in data.items() if v is not None})
+
+    @staticmethod
+    def _filter_sql(status: str | None = None, min_score: float | None = None,
+                    assessment: bool | None = None, source: str | None = None,
+                    collapse: bool = False) -> tuple[list[str], list]:
+        clauses: list[str] = []
+        params: list = []
+        if collapse:
+            clauses.append("duplicate_of IS NULL")
+        if status:
+            clauses.append("status = ?")
+            params.append(status.strip().lower())
+        if min_score is not None:
+            clauses.append("llm_score >= ?")
+            params.append(min_score)
+        if assessment is not None:
+            clauses.append("assessment_flag = ?")
+            params.append(1 if assessment else 0)
+        if source:
+            clauses.append("source = ?")
+            params.append(source)
+        return clauses, params
+
+    def list_jobs(self, limit: int = 20, cursor: str | None = None, status: str | None = None,
+                  min_score: float | None = None, assessment: bool | None = None, source: str | None = None,
+                  include_description: bool = False, collapse: bool = True) -> tuple[List[Job], str | None]:
+        """Newest-first page of jobs plus the cursor for the next page (``None`` on the last page).
+
+        With ``collapse``, near-duplicate listings are hidden behind their canonical job's ``duplicate_count``.
+        """
+        cols = LIST_COLUMNS + (["description"] if include_description else [])
+        select = LIST_COLUMNS + ([DESCRIPTION_SQL.format(t="jobs")] if include_description else [])
+        clauses, params = self._filter_sql(status, min_score, assessment, source, collapse)
+        if cursor:
+            clauses.append("(created_at, id) < (?, ?)")
+            params.extend(decode_cursor(cursor))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.conn.execute(
+            f"SELECT {','.join(select)},{DUPLICATE_COUNT_SQL.format(t='jobs')},created_at FROM jobs {where} "
+            "ORDER BY created_at DESC, id DESC LIMIT ?",
+            (*params, limit + 1),
+        ).fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][-1], rows[-1][0])
+        return [self._row_to_job(cols + ["duplicate_count"], r[:-1]) for r in rows], next_cursor
+
+    @property
+    def has_search(self) -> bool:
+        return bool(self.conn.execute("SELECT 1 FROM sqlite_master WHERE name='jobs_fts'").fetchone())
+
+    def search(self, query: str, limit: int = 20, offset: int = 0, status: str | None = None,
+               min_score: float | None = None, assessment: bool | None = None,
+               source: str | None = None, collapse: bool = True) -> List[Dict[str, Any]]:
+        """BM25-ranked full-text search (title weighted highest) with a highlighted description snippet."""
+        match = fts_query(query)
+        if not match:
+            return []
+        clauses, params = self._filter_sql(status, min_score, assessment, source, collapse)
+        where = "".join(f" AND j.{c}" for c in clauses)
+        rows = self.conn.execute(
+            f"""
+            SELECT {','.join('j.' + c for c in LIST_COLUMNS)}, {DUPLICATE_COUNT_SQL.format(t='j')},
+                   snippet(jobs_fts, 3, '<mark>', '</mark>', '…', 24),
+                   bm25(jobs_fts, 10.0, 5.0, 2.0, 1.0) AS rank
+            FROM jobs_fts JOIN jobs j ON j.rowid = jobs_fts.rowid
+            WHERE jobs_fts MATCH ?{where}
+            ORDER BY rank LIMIT ? OFFSET ?
             """,
-            (
-                job.id, job.title, job.company, job.location, job.via, job.posted_at, job.url, job.source,
-                job.description, job.salary, job.llm_score, job.llm_blurb, job.assessment_flag, job.assessment_terms,
-                status, notes,
-                datetime.utcnow().isoformat(),
-            ),
-        )
-        self.conn.commit()
-        return True
+            (match, *params, limit, offset),
+        ).fetchall()
+        return [
+            {**self._row_to_job(LIST_COLUMNS + ["duplicate_count"], r[:-2]).model_dump(), "snippet": r[-2], "rank": r[-1]}
+            for r in rows
+        ]
 
     def latest(self, limit: int = 20) -> List[Job]:
-        cur = self.conn.cursor()
-        cur.execute(
-            "SELECT id,title,company,location,via,posted_at,url,source,description,salary,llm_score,llm_blurb,assessment_flag,assessment_terms,status,notes FROM jobs ORDER BY created_at DESC LIMIT ?",
-            (limit,),
+        return self.list_jobs(limit)[0]
+
+    def export_cursor(self) -> int:
+        row = self.conn.execute("SELECT value FROM sequences WHERE name='jobs'").fetchone()
+        return row[0] if row else 0
+
+    def iter_export(self, after: int, upto: int, since_time: str | None = None, include_description: bool = False,
+                    batch: int = 5000) -> Iterator[List[tuple]]:
+        """Rows with ``after < export_seq <= upto`` in insertion order, ``batch`` at a time from one open cursor."""
+        select = EXPORT_COLUMNS + ([DESCRIPTION_SQL.format(t="jobs")] if include_description else [])
+        cur = self.conn.execute(
+            f"SELECT {','.join(select)} FROM jobs WHERE export_seq > ? AND export_seq <= ?"
+            f"{' AND created_at > ?' if since_time else ''} ORDER BY export_seq",
+            (after, upto, *([since_time] if since_time else [])),
         )
-        rows = cur.fetchall()
-        default_status = None
-        if settings.JOB_STATUS_CHOICES:
-            default_status = settings.JOB_STATUS_CHOICES[0]
-        return [Job(
-            id=r[0], title=r[1], company=r[2], location=r[3], via=r[4], posted_at=r[5], url=r[6], source=r[7],
-            description=r[8], salary=r[9], llm_score=r[10], llm_blurb=r[11], assessment_flag=r[12], assessment_terms=r[13],
-            status=(r[14] or default_status or "harvested"), notes=(r[15] or "")
-        ) for r in rows]
+        try:
+            while rows := cur.fetchmany(batch):
+                yield rows
+        finally:
+            cur.close()
+
+    def register_shards(self, run_id: str, keys: List[str]) -> tuple[set[str], bool]:
+        """Record a run's shards unless a worker already did.
+
+        Returns the keys finished by an earlier attempt and whether this call registered the shards.
+        """
+        with self.conn:
+            registered = not self.conn.execute("SELECT 1 FROM run_items WHERE run_id=? LIMIT 1", (run_id,)).fetchone()
+            if registered:
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO run_items(run_id, shard, seq, status) VALUES(?,?,?,'pending')",
+                    [(run_id, key, i) for i, key in enumerate(keys)],
+                )
+        rows = self.conn.execute("SELECT shard FROM run_items WHERE run_id=? AND status='done'", (run_id,)).fetchall()
+        return {r[0] for r in rows}, registered
+
+    def claim_shards(self, run_id: str, owner: str, limit: int) -> List[str]:
+        """Lease up to ``limit`` unclaimed shards of a running run to ``owner``, in shard order.
+
+        Shards whose lease expired (the worker died or stalled) are claimable again. After
+        ``SHARD_MAX_ATTEMPTS`` expired leases a shard is marked ``failed`` instead of being retried forever.
+        """
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute(
+                "UPDATE run_items SET status='failed', lease_owner=NULL, finished_at=? "
+                "WHERE run_id=? AND status='leased' AND lease_expires < ? AND attempts >= ?",
+                (datetime.utcnow().isoformat(), run_id, now, max(1, settings.SHARD_MAX_ATTEMPTS)),
+            )
+            rows = self.conn.execute(
+                """
+                UPDATE run_items SET status='leased', lease_owner=?, lease_expires=?, attempts=attempts+1
+                WHERE rowid IN (
+                    SELECT rowid FROM run_items
+                    WHERE run_id=? AND (status='pending' OR (status='leased' AND lease_expires < ?))
+                      AND EXISTS (SELECT 1 FROM runs WHERE id=? AND status='running')
+                    ORDER BY seq LIMIT ?
+                )
+                RETURNING seq, shard
+                """,
+                (owner, now + settings.SHARD_LEASE_SECS, run_id, now, run_id, limit),
+            ).fetchall()
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        return [shard for _, shard in sorted(rows)]
+
+    def finish_shard(self, run_id: str, key: str, found: int, inserted: int) -> None:
+        with DB_WRITE_SECONDS.time(op="checkpoint"), self.conn:
+            self.conn.execute(
+                "UPDATE run_items SET status='done', found=?, inserted=?, finished_at=?, lease_owner=NULL "
+                "WHERE run_id=? AND shard=?",
+                (found, inserted, datetime.utcnow().isoformat(), run_id, key),
+            )
+
+    def stale_scores(self, model: str, prompt_version: str, chunk: int = 200,
+                     include_unscored: bool = False) -> Iterator[List[Job]]:
+        """Canonical jobs whose score came from another model or prompt version, in rowid chunks, descriptions included.
+
+        Each chunk is read after the previous one was handled, so rows written in between are not revisited.
+        """
+        cols = LIST_COLUMNS + ["description"]
+        select = ",".join(LIST_COLUMNS + [DESCRIPTION_SQL.format(t="jobs")])
+        scored = "" if include_unscored else LLM_SCORED_SQL
+        last = 0
+        while True:
+            rows = self.conn.execute(
+                f"SELECT rowid,{select} FROM jobs WHERE rowid > ? AND duplicate_of IS NULL{scored} "
+                "AND (llm_model IS NOT ? OR prompt_version IS NOT ?) ORDER BY rowid LIMIT ?",
+                (last, model, prompt_version, chunk),
+            ).fetchall()
+            if not rows:
+                return
+            last = rows[-1][0]
+            yield [self._row_to_job(cols, r[1:]) for r in rows]
+
+    def count_stale_scores(self, model: str, prompt_version: str, include_unscored: bool = False) -> int:
+        scored = "" if include_unscored else LLM_SCORED_SQL
+        return self.conn.execute(
+            f"SELECT COUNT(*) FROM jobs WHERE duplicate_of IS NULL{scored} "
+            "AND (llm_model IS NOT ? OR prompt_version IS NOT ?)",
+            (model, prompt_version),
+        ).fetchone()[0]
+
+    def save_scores(self, jobs: Iterable[Job]) -> None:
+        with DB_WRITE_SECONDS.time(op="scores"), self.conn:
+            self.conn.executemany(
+                "UPDATE jobs SET llm_score=?, llm_blurb=?, llm_model=?, prompt_version=?, local_score=? WHERE id=?",
+                [(j.llm_score, j.llm_blurb, j.llm_model, j.prompt_version, j.local_score, j.id) for j in jobs],
+            )
 
     def update_status(self, job_id: str, status: str, notes: str | None = None) -> bool:
         if settings.JOB_STATUS_CHOICES and status not in settings.JOB_STATUS_CHOICES:
@@ -75,66 +422,533 @@ class Store:
         self.conn.commit()
         return True
 
+CSV_HEADER = [
+    "title","company","location","url","source","via","posted_at","salary",
+    "llm_score","llm_blurb","local_score","assessment_flag","assessment_terms","status","notes","description"
+]
+
+def _csv_row(j: Job) -> list:
+    return [
+        j.title, j.company, j.location, j.url, j.source, j.via, j.posted_at, j.salary,
+        j.llm_score or "", j.llm_blurb or "",
+        "" if j.local_score is None else j.local_score, j.assessment_flag, j.assessment_terms, j.status, j.notes, j.description
+    ]
+
 class Exporter:
+    @staticmethod
+    def new_csv_path(outdir: str) -> str:
+        """Reserve a new CSV file; workers starting in the same second get numbered suffixes."""
+        import os
+        os.makedirs(outdir or ".", exist_ok=True)
+        stem = f"{outdir}/jobs_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+        n = 0
+        while True:
+            path = f"{stem}_{n}.csv" if n else f"{stem}.csv"
+            try:
+                open(path, "x").close()
+                return path
+            except FileExistsError:
+                n += 1
+
+    @staticmethod
+    def append_csv(jobs: List[Job], path: str) -> None:
+        """Append rows to ``path``, writing the header first if the file is new."""
+        import os
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        fresh = not os.path.exists(path) or os.path.getsize(path) == 0
+        with open(path, "a", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            if fresh:
+                w.writerow(CSV_HEADER)
+            w.writerows(_csv_row(j) for j in jobs)
+
     @staticmethod
     def export_csv(jobs: List[Job], outdir: str) -> str | None:
         if not jobs:
             return None
-        import os
-        os.makedirs(outdir, exist_ok=True)
-        fname = f"{outdir}/jobs_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.csv"
-        with open(fname, "w", newline="", encoding="utf-8") as f:
-            w = csv.writer(f)
-            w.writerow([
-                "title","company","location","url","source","via","posted_at","salary",
-                "llm_score","llm_blurb","assessment_flag","assessment_terms","status","notes","description"
-            ])
-            for j in jobs:
-                w.writerow([
-                    j.title, j.company, j.location, j.url, j.source, j.via, j.posted_at, j.salary,
-                    j.llm_score or "", j.llm_blurb or "", j.assessment_flag, j.assessment_terms, j.status, j.notes, j.description
-                ])
+        fname = Exporter.new_csv_path(outdir)
+        Exporter.append_csv(jobs, fname)
         return fname
 
+    @staticmethod
+    def parquet_available() -> bool:
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except Exception:
+            return False
+        return True
+
+    @staticmethod
+    def stream(fmt: str, columns: List[str], batches: Iterable[List[tuple]]) -> Iterator[bytes]:
+        """Encode row batches as ``csv``, ``ndjson`` or ``parquet`` (one row group per batch), one chunk per batch."""
+        if fmt == "parquet":
+            yield from _parquet_chunks(columns, batches)
+            return
+        if fmt == "csv":
+            buf = io.StringIO()
+            w = csv.writer(buf)
+            w.writerow(columns)
+            yield buf.getvalue().encode("utf-8")
+            for rows in batches:
+                buf.seek(0)
+                buf.truncate()
+                w.writerows(rows)
+                yield buf.getvalue().encode("utf-8")
+            return
+        for rows in batches:
+            yield "".join(json.dumps(dict(zip(columns, r)), ensure_ascii=False) + "\n" for r in rows).encode("utf-8")
+
+    @staticmethod
+    def export(fmt: str, since: str | None = None, include_description: bool = False) -> tuple[int, Iterator[bytes]]:
+        """Stream every job inserted after ``since`` and return the cursor to pass as ``since`` next time.
+
+        The cursor is the last ``export_seq`` handed out when the export starts, so rows stored while it streams
+        go to the next delta. The export reads through its own connection, which is closed once the stream ends.
+        """
+        after, since_time = parse_since(since)
+        store = Store()
+        upto = store.export_cursor()
+        columns = EXPORT_COLUMNS + (["description"] if include_description else [])
+        batch = max(1, settings.EXPORT_BATCH_SIZE)
+        if include_description:
+            # Descriptions run up to 20 KB each; keep a chunk to a few MB.
+            batch = min(batch, DESCRIPTION_EXPORT_BATCH)
+        batches = store.iter_export(after, upto, since_time, include_description, batch)
+
+        def chunks() -> Iterator[bytes]:
+            try:
+                yield from Exporter.stream(fmt, columns, batches)
+            finally:
+                batches.close()
+                store.conn.close()
+
+        return max(upto, after), chunks()
+
+class _Drain(io.RawIOBase):
+    """Write-only sink that hands back whatever was written since the last ``take``."""
+
+    def __init__(self):
+        self._parts: List[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._parts.append(bytes(b))
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def take(self) -> bytes:
+        out = b"".join(self._parts)
+        self._parts.clear()
+        return out
+
+PARQUET_TYPES = {"llm_score": "float64", "local_score": "float64", "desc_len": "int64", "assessment_flag": "int64"}
+
+def _parquet_chunks(columns: List[str], batches: Iterable[List[tuple]]) -> Iterator[bytes]:
+    # pyarrow is optional and heavy, so it is imported only when Parquet is asked for.
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = pa.schema([(c, pa.type_for_alias(PARQUET_TYPES.get(c, "string"))) for c in columns])
+    sink = _Drain()
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+        for rows in batches:
+            writer.write_table(pa.table({c: [r[i] for r in rows] for i, c in enumerate(columns)}, schema=schema))
+            yield sink.take()
+    yield sink.take()
+
+class RunProgress:
+    """Live per-stage counters for one run, updated from worker threads and read by ``GET /runs/{id}``."""
+
+    FIELDS = ("searches_total", "searches_done", "pages_total", "pages_scraped",
+              "jobs_to_score", "jobs_scored", "inserted", "skipped_known")
+
+    def __init__(self):
+        self.stage = "pending"
+        self._counts = dict.fromkeys(self.FIELDS, 0)
+        self._lock = threading.Lock()
+
+    def set(self, stage: str | None = None, **counts: int) -> None:
+        with self._lock:
+            if stage:
+                self.stage = stage
+            self._counts.update(counts)
+
+    def incr(self, field: str, n: int = 1) -> None:
+        with self._lock:
+            self._counts[field] += n
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"stage": self.stage, **self._counts}
+
+class Shard(NamedTuple):
+    """One (engine, location, query) search; ``key`` identifies it in ``run_items`` checkpoints."""
+    key: str
+    source: type
+    query: str
+    location: str
+    max_results: int
+
+Batch = Tuple[Shard, List[Job]]
+
+def configured_shards() -> List[Shard]:
+    """Every (engine, location, query) search the settings describe, before the query planner picks from them."""
+    shards = []
+    for location in (settings.LOCATIONS or ["Remote"]):
+        for q in queries():
+            for source, max_results in ((SerpGoogleJobs, settings.MAX_RESULTS),
+                                        (SerpLinkedInJobs, max(0, settings.MAX_RESULTS//2))):
+                shards.append(Shard(f"{source.engine}|{location}|{q}", source, q, location, max_results))
+    return shards
+
 class Runner:
     def __init__(self):
         self.store = Store()
-        self.llm = LLMScorer()
-
-    def _queries(self) -> list[str]:
-        extras = f" {' '.join(settings.QUERY_KEYWORDS)}" if settings.QUERY_KEYWORDS else ""
-        return [f"{t}{extras}".strip() for t in (settings.QUERY_TITLES or [])]
+        self.cache = ScoreCache(self.store.conn)
+        self.llm = LLMScorer(cache=self.cache)
+        self.seniority = TermMatcher(settings.SENIOR_TERMS)
+        self.planner = QueryPlanner(self.store.conn)
 
     def _is_senior(self, title: str) -> bool:
-        tl = title.lower()
-        return any(k in tl for k in ["chief","vp","director","head","lead","principal"]) and not any(k in tl for k in ["intern","junior","entry"])
+        return self.seniority.matches(title)
+
+    def _prerank(self, jobs: List[Job]) -> List[Job]:
+        """Attach a local relevance score to every job; return the ones worth an LLM call, best first."""
+        if not (settings.ENABLE_PRERANK and jobs):
+            return jobs
+        docs = [f"{j.title} {j.title} {j.company} {j.description}" for j in jobs]
+        sims = similarity(docs, settings.CANDIDATE_PROFILE)
+        for job, sim in zip(jobs, sims):
+            job.local_score = round(float(sim) * 100, 1)
+        ranked = sorted(range(len(jobs)), key=lambda i: -sims[i])
+        return [jobs[i] for i in ranked if sims[i] >= settings.PRERANK_MIN_SIMILARITY]
+
+    def _llm_score(self, jobs: List[Job], budget: TokenBudget, progress: RunProgress,
+                   stats: Dict[str, Any]) -> None:
+        stats["llm_shortlisted"] += len(jobs)
+        progress.incr("jobs_to_score", len(jobs))
+        self.llm.score_many(jobs, budget=budget)
+        for job in jobs:
+            if job.llm_score is not None:
+                job.llm_model, job.prompt_version = self.llm.model, self.llm.prompt_version
+        progress.incr("jobs_scored", sum(1 for j in jobs if j.llm_score is not None))
+
+    @staticmethod
+    def _boost(jobs: List[Job]) -> None:
+        if not settings.ENABLE_ASSESSMENT_BOOST:
+            return
+        for job in jobs:
+            if job.assessment_flag:
+                # Jobs the LLM did not score get the boost on their local score, never a made-up llm_score.
+                if job.llm_score is not None:
+                    job.llm_score = min(job.llm_score + settings.ASSESSMENT_SCORE_BOOST, 100.0)
+                elif job.local_score is not None:
+                    job.local_score = min(job.local_score + settings.ASSESSMENT_SCORE_BOOST, 100.0)
+
+    @staticmethod
+    def _search(shard: Shard, known: frozenset[str], yields: Dict[str, Counter]) -> List[Job]:
+        engine = shard.source.engine
+        with count_requests() as usage:
+            try:
+                with SEARCH_SECONDS.time(engine=engine):
+                    jobs = shard.source.search(shard.query, shard.location, settings.REMOTE_ONLY, shard.max_results,
+                                               known=known)
+                SEARCH_RESULTS.inc(len(jobs), engine=engine)
+            except Exception as exc:
+                SEARCH_ERRORS.inc(engine=engine)
+                rprint(f"[red]Search failed[/red] {shard.source.__name__} q='{shard.query}' in '{shard.location}': {exc}")
+                jobs = []
+                usage.failures += 1
+        yields[shard.key].update(results=len(jobs), credits=usage.credits, failed=usage.failures)
+        return jobs
+
+    # Pipeline stages. Each consumes and yields (shard, jobs) batches, so a shard's jobs are persisted
+    # as soon as they clear the last stage instead of waiting for the whole run.
+
+    @staticmethod
+    def _timed(stage: str, build: Callable[[Iterable[Batch]], Iterator[Batch]],
+               upstream: Iterable[Batch]) -> Iterator[Batch]:
+        """Run ``build(upstream)`` and record each batch's time in ``harvest_stage_seconds``, minus upstream time."""
+        waited = [0.0]
+
+        def pull() -> Iterator[Batch]:
+            it = iter(upstream)
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(it)
+                except StopIteration:
+                    return
+                finally:
+                    waited[0] += time.perf_counter() - start
+                yield item
+
+        gen = build(pull())
+        while True:
+            waited[0] = 0.0
+            start = time.perf_counter()
+            try:
+                item = next(gen)
+            except StopIteration:
+                return
+            STAGE_SECONDS.observe(time.perf_counter() - start - waited[0], stage=stage)
+            yield item
+
+    def _search_stage(self, shards: Iterable[Shard], known: frozenset[str], progress: RunProgress,
+                      yields: Dict[str, Counter], ahead: int | None = None) -> Iterator[Batch]:
+        """Search shards in parallel. With ``ahead``, at most that many are pulled from ``shards`` before their
+        batches are consumed, so a queue-backed iterator only claims what this worker is about to process."""
+        shards = iter(shards)
+        with ThreadPoolExecutor(max_workers=max(1, settings.SERP_CONCURRENCY)) as pool:
+            inflight: deque = deque()
 
-    def run_once(self) -> Dict[str, Any]:
+            def fill() -> None:
+                while ahead is None or len(inflight) < ahead:
+                    shard = next(shards, None)
+                    if shard is None:
+                        return
+                    inflight.append((shard, pool.submit(self._search, shard, known, yields)))
+
+            fill()
+            # Consumed in submission order, so results stay deterministic while later searches keep running.
+            while inflight:
+                shard, fut = inflight.popleft()
+                jobs = fut.result()
+                progress.incr("searches_done")
+                fill()
+                yield shard, jobs
+
+    def _claimed(self, shards: List[Shard], run_id: str, owner: str, progress: RunProgress) -> Iterator[Shard]:
+        """Shards leased from the ``run_items`` queue, claimed a batch at a time as the search stage asks."""
+        by_key = {s.key: s for s in shards}
+        size = max(1, settings.SERP_CONCURRENCY)
+        while True:
+            keys = self.store.claim_shards(run_id, owner, size)
+            if not keys:
+                return
+            progress.incr("searches_total", len(keys))
+            for key in keys:
+                if key in by_key:
+                    yield by_key[key]
+                else:
+                    # Registered by a worker with a different search config; nothing to run here.
+                    self.store.finish_shard(run_id, key, found=0, inserted=0)
+
+    def _dedup_stage(self, batches: Iterable[Batch], seen: set[str], stats: Dict[str, Any]) -> Iterator[Batch]:
+        for shard, jobs in batches:
+            keep = []
+            for job in jobs:
+                if not self._is_senior(job.title):
+                    continue
+                if job.id in seen:
+                    stats["skipped_known"] += 1
+                    stats["yield"][shard.key]["duplicates"] += 1
+                    continue
+                seen.add(job.id)
+                keep.append(job)
+            yield shard, keep
+
+    def _load_signatures(self) -> dedup.SignatureIndex:
+        index = dedup.SignatureIndex(settings.DEDUP_MAX_DISTANCE)
+        if settings.ENABLE_NEAR_DEDUP:
+            for sig, duplicate_of in self.store.load_signatures(settings.DEDUP_WINDOW_DAYS):
+                index.add(sig, duplicate_of)
+        return index
+
+    def _near_dup_stage(self, batches: Iterable[Batch], index: dedup.SignatureIndex,
+                        stats: Dict[str, Any]) -> Iterator[Batch]:
+        """Link listings whose title/company/city match an indexed job, before they cost a scrape or LLM call."""
+        for shard, jobs in batches:
+            if settings.ENABLE_NEAR_DEDUP:
+                for job in jobs:
+                    sig = dedup.head_signature(job)
+                    job.duplicate_of = index.match_head(sig)
+                    index.add(sig, job.duplicate_of)
+                    stats["near_duplicates"] += job.duplicate_of is not None
+            yield shard, jobs
+
+    def _scrape_stage(self, batches: Iterable[Batch], progress: RunProgress, index: dedup.SignatureIndex,
+                      stats: Dict[str, Any]) -> Iterator[Batch]:
+        for shard, jobs in batches:
+            todo = [j for j in jobs if not j.duplicate_of]
+            progress.incr("pages_total", len({j.url for j in todo if j.url}))
+            pages = fetch_many((j.url for j in todo), on_done=lambda: progress.incr("pages_scraped"))
+            for job in todo:
+                full_text = pages.get(job.url, "")
+                if full_text:
+                    job.description = (full_text + SNIPPET_MARKER + (job.description or ""))[:20000]
+                sig = index.signature(job.id)
+                body = dedup.body_signature(job) if sig else None
+                if body is None:
+                    continue
+                sig = sig._replace(body=body)
+                job.duplicate_of = index.match_body(sig)
+                if job.duplicate_of:
+                    index.link(job.id, job.duplicate_of)
+                    stats["near_duplicates"] += 1
+                index.set_body(job.id, body)
+            yield shard, jobs
+
+    def _detect_stage(self, batches: Iterable[Batch]) -> Iterator[Batch]:
+        dropped: set[str] = set()
+        for shard, jobs in batches:
+            keep = []
+            for job in jobs:
+                if job.duplicate_of:
+                    # Duplicates follow their canonical job, which was seen earlier in the run or already stored.
+                    if job.duplicate_of not in dropped:
+                        keep.append(job)
+                    continue
+                flag, terms = detect_assessment(job.description or "")
+                job.assessment_flag, job.assessment_terms = flag, terms
+                if settings.ENABLE_ASSESSMENT_FILTER and not job.assessment_flag:
+                    dropped.add(job.id)
+                    continue
+                keep.append(job)
+            yield shard, keep
+
+    def _score_stage(self, batches: Iterable[Batch], budget: TokenBudget, progress: RunProgress,
+                     stats: Dict[str, Any]) -> Iterator[Batch]:
+        for shard, jobs in batches:
+            originals = [j for j in jobs if not j.duplicate_of]
+            shortlisted = self._prerank(originals)
+            if stats["deferred"]:
+                # A capped run scores once every shard is stored (_score_run), so the cap goes to its best jobs.
+                stats["shortlist"].update((j.id, shard.key) for j in shortlisted)
+            else:
+                self._llm_score(shortlisted, budget, progress, stats)
+                self._boost(originals)
+            yield shard, jobs
+
+    def _score_run(self, jobs: List[Job], budget: TokenBudget, progress: RunProgress, stats: Dict[str, Any]) -> None:
+        """LLM pass of a capped run: the ``PRERANK_TOP_K`` best shortlisted new jobs by ``local_score``, across
+        every shard this worker stored. Scores are written back, booked on each job's shard in the planner, and
+        the run's CSV is written."""
+        originals = [j for j in jobs if not j.duplicate_of]
+        shortlist = stats["shortlist"]
+        best = sorted((j for j in originals if j.id in shortlist), key=lambda j: -(j.local_score or 0.0))
+        best = best[:settings.PRERANK_TOP_K]
+        with STAGE_SECONDS.time(stage="score"):
+            self._llm_score(best, budget, progress, stats)
+        self._boost(originals)
+        self.store.save_scores(originals)
+        self.planner.record_scores((shortlist[j.id], j.llm_score) for j in best if j.llm_score is not None)
+        if originals:
+            stats["csv"] = Exporter.new_csv_path(settings.OUTPUT_DIR)
+            Exporter.append_csv(originals, stats["csv"])
+
+    def _persist_stage(self, batches: Iterable[Batch], run_id: str | None, progress: RunProgress,
+                       index: dedup.SignatureIndex, stats: Dict[str, Any]) -> Iterator[Batch]:
+        for shard, jobs in batches:
+            new_ids = self.store.upsert_many(jobs)
+            new = [job for job in jobs if job.id in new_ids]
+            if settings.ENABLE_NEAR_DEDUP:
+                self.store.save_signatures(s for s in map(index.signature, new_ids) if s)
+            if run_id:
+                self.store.finish_shard(run_id, shard.key, found=len(jobs), inserted=len(new))
+            originals = [job for job in new if not job.duplicate_of]
+            y = stats["yield"].pop(shard.key, Counter())
+            self.planner.record(shard, stats["started"], results=y["results"], credits=y["credits"],
+                                duplicates=y["duplicates"] + sum(1 for j in jobs if j.duplicate_of),
+                                inserted=len(originals),
+                                scores=[j.llm_score for j in originals if j.llm_score is not None],
+                                failed=bool(y["failed"]))
+            if originals and not stats["deferred"]:
+                stats["csv"] = stats["csv"] or Exporter.new_csv_path(settings.OUTPUT_DIR)
+                Exporter.append_csv(originals, stats["csv"])
+            progress.incr("inserted", len(new))
+            JOBS_INSERTED.inc(len(new))
+            yield shard, new
+
+    def run_once(self, progress: RunProgress | None = None, run_id: str | None = None,
+                 owner: str = "local") -> Dict[str, Any]:
+        """Run one harvest.
+
+        With ``run_id``, the run's shards are a work queue in ``run_items``: this worker leases shards as it goes,
+        other workers (processes or containers) sharing the database take the rest, and finished shards are
+        checkpointed and skipped on resume.
+        """
+        progress = progress or RunProgress()
+        started = time.time()
+        shards = configured_shards()
+        decisions = self.planner.plan(shards, now=started)
+        planned = [d.shard for d in decisions if d.run]
+        skipped = len(shards) - len(planned)
+        resumed = 0
+        acted = True
+        source: Iterable[Shard] = planned
+        if run_id:
+            # Only the first worker's plan is registered; joiners claim from it, so they need every shard by key.
+            done, acted = self.store.register_shards(run_id, [s.key for s in planned])
+            resumed = len(done)
+            source = self._claimed(shards, run_id, owner, progress)
+        if acted:
+            for d in decisions:
+                PLANNED_SHARDS.inc(decision="run" if d.run else "skip")
+        # Loaded once per run so repeats are dropped before any scrape/LLM work.
+        seen = self.store.known_ids()
+        index = self._load_signatures()
+        self.cache.evict()
+        serp_cache.evict()
+        cache_hits, cache_misses = self.cache.hits, self.cache.misses
+        serp_hits, serp_misses = serp_cache.hits, serp_cache.misses
+        budget = TokenBudget.from_settings()
+        stats: Dict[str, Any] = {"skipped_known": 0, "near_duplicates": 0, "llm_shortlisted": 0, "csv": None,
+                                 "deferred": settings.ENABLE_PRERANK and settings.PRERANK_TOP_K > 0,
+                                 "shortlist": {},
+                                 "started": started, "yield": defaultdict(Counter)}
+        if run_id:
+            progress.set("harvest")
+        else:
+            progress.set("harvest", searches_total=len(planned))
+        rprint(f"[bold]Searching[/bold] {len(planned)} query/location/engine shards REMOTE_ONLY={settings.REMOTE_ONLY} "
+               f"(concurrency={settings.SERP_CONCURRENCY}{f', {skipped} skipped by the planner' if skipped else ''}"
+               f"{f', resumed past {resumed}' if resumed else ''}"
+               f"{', shared work queue' if run_id else ''})")
+        # Searches stop paging at stored jobs; they get a frozen copy since dedup keeps adding to ``seen``.
+        known = frozenset(seen)
+        ahead = 2 * max(1, settings.SERP_CONCURRENCY) if run_id else None
+        pipeline = self._timed("search", lambda _: self._search_stage(source, known, progress, stats["yield"], ahead), ())
+        pipeline = self._timed("dedup", lambda b: self._dedup_stage(b, seen, stats), pipeline)
+        pipeline = self._timed("near_dup", lambda b: self._near_dup_stage(b, index, stats), pipeline)
+        pipeline = self._timed("scrape", lambda b: self._scrape_stage(b, progress, index, stats), pipeline)
+        pipeline = self._timed("detect", self._detect_stage, pipeline)
+        pipeline = self._timed("score", lambda b: self._score_stage(b, budget, progress, stats), pipeline)
+        pipeline = self._timed("persist", lambda b: self._persist_stage(b, run_id, progress, index, stats), pipeline)
         all_new: list[Job] = []
-        for location in (settings.LOCATIONS or ["Remote"]):
-            for q in self._queries():
-                rprint(f"[bold]Searching[/bold] q='{q}' in '{location}' REMOTE_ONLY={settings.REMOTE_ONLY}")
-                gj = SerpGoogleJobs.search(q, location, settings.REMOTE_ONLY, settings.MAX_RESULTS)
-                lj = SerpLinkedInJobs.search(q, location, settings.REMOTE_ONLY, max(0, settings.MAX_RESULTS//2))
-                for job in gj + lj:
-                    if not self._is_senior(job.title):
-                        continue
-                    full_text = fetch_full_description(job.url)
-                    if full_text:
-                        job.description = (full_text + "\n\n---\nSERP snippet:\n" + (job.description or ""))[:20000]
-                    flag, terms = detect_assessment(job.description or "")
-                    job.assessment_flag, job.assessment_terms = flag, terms
-                    if settings.ENABLE_ASSESSMENT_FILTER and not job.assessment_flag:
-                        continue
-                    job = self.llm.score_and_blurb(job)
-                    if settings.ENABLE_ASSESSMENT_BOOST and job.assessment_flag:
-                        job.llm_score = min((job.llm_score or 0) + settings.ASSESSMENT_SCORE_BOOST, 100.0)
-                    inserted = self.store.upsert(job)
-                    if inserted:
-                        all_new.append(job)
-        csv_path = Exporter.export_csv(all_new, settings.OUTPUT_DIR)
-        self._print_table(all_new)
-        return {"inserted": len(all_new), "csv": csv_path}
+        for _, new in pipeline:
+            all_new.extend(new)
+            progress.set(skipped_known=stats["skipped_known"])
+        if stats["deferred"]:
+            self._score_run(all_new, budget, progress, stats)
+        progress.set("done", skipped_known=stats["skipped_known"])
+        self._print_table([j for j in all_new if not j.duplicate_of])
+        if stats["skipped_known"]:
+            rprint(f"[dim]Skipped {stats['skipped_known']} already-known jobs.[/dim]")
+        if stats["near_duplicates"]:
+            rprint(f"[dim]Linked {stats['near_duplicates']} near-duplicate listings to their canonical jobs.[/dim]")
+        rprint(f"[dim]LLM score cache: {self.cache.hits - cache_hits} hits, {self.cache.misses - cache_misses} misses. "
+               f"SerpAPI cache: {serp_cache.hits - serp_hits} hits, {serp_cache.misses - serp_misses} misses.[/dim]")
+        return {
+            "inserted": len(all_new),
+            "skipped_known": stats["skipped_known"],
+            "near_duplicates": stats["near_duplicates"],
+            "shards_resumed": resumed,
+            "shards_skipped": skipped,
+            "serp_cache_hits": serp_cache.hits - serp_hits,
+            "serp_cache_misses": serp_cache.misses - serp_misses,
+            "llm_cache_hits": self.cache.hits - cache_hits,
+            "llm_cache_misses": self.cache.misses - cache_misses,
+            "llm_shortlisted": stats["llm_shortlisted"],
+            "llm_tokens": budget.used,
+            "llm_budget_exhausted": budget.exhausted,
+            "csv": stats["csv"],
+        }
 
     def _print_table(self, jobs: list[Job]):
         if not jobs:
@@ -0,0 +1,92 @@
+import re
+import string
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+# str.translate + split tokenizes several times faster than a \w+ regex on 20 KB descriptions.
+PUNCT_TABLE = str.maketrans({c: " " for c in string.punctuation + "‘’“”–—…•·«»¿¡"})
+WEIGHT_PAT = re.compile(r"^(.*?):\s*(-?\d+(?:\.\d+)?)$")
+
+
+def words(text: str) -> List[str]:
+    return text.lower().translate(PUNCT_TABLE).split()
+
+
+class MatchResult(NamedTuple):
+    score: float
+    positive: List[str]
+    negative: List[str]
+
+
+def parse_term(raw: str) -> Tuple[str, float, bool] | None:
+    """``"case study:2"`` -> ("case study", 2.0, False); ``"-intern"`` -> ("intern", 1.0, True)."""
+    term = raw.strip().lower()
+    negative = term.startswith("-")
+    term = term.lstrip("-").strip()
+    weight = 1.0
+    m = WEIGHT_PAT.match(term)
+    if m:
+        term, weight = m.group(1).strip(), float(m.group(2))
+    term = " ".join(words(term))
+    return (term, weight, negative) if term else None
+
+
+def _plurals(word: str) -> List[str]:
+    forms = [word, word + "s", word + "es"]
+    if word.endswith("y"):
+        forms.append(word[:-1] + "ies")
+    return forms
+
+
+class TermMatcher:
+    """Weighted term list compiled into a word-level trie, so text is tokenized and walked once.
+
+    Matching is on whole words (``lead`` never matches ``leading``; ``entry-level`` equals ``entry level``),
+    and the last word of a term may be plural (``s``, ``es``, ``y`` -> ``ies``). ``"term:2"`` sets a weight
+    (default 1) and a leading ``-`` marks a negative term that vetoes the match.
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        self.weights: Dict[str, float] = {}
+        self.negative: set[str] = set()
+        # Trie over words; the "" key marks the end of a term and holds its canonical name.
+        self._root: Dict[str, dict] = {}
+        for raw in terms:
+            parsed = parse_term(raw)
+            if not parsed:
+                continue
+            term, weight, negative = parsed
+            self.weights[term] = weight
+            if negative:
+                self.negative.add(term)
+            parts = term.split()
+            nodes = [self._root]
+            for w in parts[:-1]:
+                nodes = [n.setdefault(w, {}) for n in nodes]
+            for form in _plurals(parts[-1]):
+                for n in nodes:
+                    n.setdefault(form, {})[""] = term
+        self._starts = frozenset(self._root)
+
+    def scan(self, text: str | None) -> MatchResult:
+        """Distinct terms found in ``text`` (first-seen order) and the summed weight of the positive ones."""
+        if not text or not self._starts:
+            return MatchResult(0.0, [], [])
+        toks = words(text)
+        found: Dict[str, None] = {}
+        starts = self._starts
+        # Only positions whose word begins some term are walked; the rest is skipped by a set lookup.
+        for i in [i for i, w in enumerate(toks) if w in starts]:
+            node, j, hit = self._root, i, None
+            while j < len(toks) and toks[j] in node:
+                node = node[toks[j]]
+                hit = node.get("", hit)
+                j += 1
+            if hit:
+                found[hit] = None
+        positive = [t for t in found if t not in self.negative]
+        negative = [t for t in found if t in self.negative]
+        return MatchResult(sum(self.weights[t] for t in positive), positive, negative)
+
+    def matches(self, text: str | None, min_score: float = 1.0) -> bool:
+        res = self.scan(text)
+        return res.score >= min_score and not res.negative
@@ -0,0 +1,142 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt(name: str, key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return name
+    inner = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return f"{name}{{{inner}}}"
+
+
+def _num(v: float) -> str:
+    return str(int(v)) if float(v).is_integer() else repr(float(v))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name, self.help = name, help
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[Tuple[str, float]]:
+        with self._lock:
+            return [(_fmt(self.name, k), v) for k, v in sorted(self._values.items())]
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name, self.help, self.buckets = name, help, tuple(sorted(buckets))
+        # Per label set: one count per bucket (non-cumulative), then sum and count.
+        self._values: Dict[LabelKey, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _labels(labels)
+        with self._lock:
+            row = self._values.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+                    break
+            row[-2] += value
+            row[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[Tuple[str, float]]:
+        out = []
+        with self._lock:
+            for key, row in sorted(self._values.items()):
+                cumulative = 0.0
+                for bound, n in zip(self.buckets, row):
+                    cumulative += n
+                    out.append((_fmt(f"{self.name}_bucket", key, (("le", _num(bound)),)), cumulative))
+                out.append((_fmt(f"{self.name}_bucket", key, (("le", "+Inf"),)), row[-1]))
+                out.append((_fmt(f"{self.name}_sum", key), row[-2]))
+                out.append((_fmt(f"{self.name}_count", key), row[-1]))
+        return out
+
+
+class Registry:
+    """Process-wide metrics, rendered in the Prometheus text format (version 0.0.4)."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Counter | Histogram] = {}
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._metrics.setdefault(name, Counter(name, help))
+
+    def histogram(self, name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._metrics.setdefault(name, Histogram(name, help, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for m in self._metrics.values():
+            lines.append(f"# HELP {m.name} {m.help}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            lines.extend(f"{name} {_num(v)}" for name, v in m.samples())
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> Dict[str, float]:
+        """Counter values and histogram sums/counts keyed by sample name, for per-run deltas."""
+        out: Dict[str, float] = {}
+        for m in self._metrics.values():
+            for name, v in m.samples():
+                if "_bucket{" not in name:
+                    out[name] = v
+        return out
+
+
+REGISTRY = Registry()
+
+SEARCH_SECONDS = REGISTRY.histogram("harvest_search_seconds", "SerpAPI search latency per shard, including pagination")
+SEARCH_RESULTS = REGISTRY.counter("harvest_search_results_total", "Jobs returned by searches")
+SEARCH_ERRORS = REGISTRY.counter("harvest_search_errors_total", "Searches that raised")
+SERP_REQUESTS = REGISTRY.counter("harvest_serp_requests_total", "SerpAPI HTTP requests sent (cache misses)")
+SCRAPE_SECONDS = REGISTRY.histogram("harvest_scrape_seconds", "Job page fetch latency")
+SCRAPE_BYTES = REGISTRY.counter("harvest_scrape_bytes_total", "Job page bytes read")
+SCRAPE_PAGES = REGISTRY.counter("harvest_scrape_pages_total", "Job page fetches by outcome")
+LLM_SECONDS = REGISTRY.histogram("harvest_llm_seconds", "LLM completion latency")
+LLM_TOKENS = REGISTRY.counter("harvest_llm_tokens_total", "LLM tokens used")
+LLM_ERRORS = REGISTRY.counter("harvest_llm_errors_total", "Failed LLM requests or unparseable replies")
+DB_WRITE_SECONDS = REGISTRY.histogram(
+    "harvest_db_write_seconds", "SQLite write transaction time", (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+CACHE_REQUESTS = REGISTRY.counter("harvest_cache_requests_total", "Cache lookups by cache and result")
+STAGE_SECONDS = REGISTRY.histogram("harvest_stage_seconds", "Time spent in each pipeline stage per shard")
+RUNS = REGISTRY.counter("harvest_runs_total", "Finished runs by status")
+RUN_SECONDS = REGISTRY.histogram("harvest_run_seconds", "Wall time per run", (10, 30, 60, 120, 300, 600, 1800, 3600))
+JOBS_INSERTED = REGISTRY.counter("harvest_jobs_inserted_total", "Jobs inserted")
+RESCORED_JOBS = REGISTRY.counter("harvest_rescored_jobs_total", "Stored jobs re-scored by a rescore, by outcome")
+PLANNED_SHARDS = REGISTRY.counter("harvest_planned_shards_total", "Query planner decisions per shard (run or skip) acted on by runs")
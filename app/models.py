@@ -1,6 +1,9 @@
 from pydantic import BaseModel
 from typing import Optional
 
+# Separates scraped page text from the SERP snippet appended after it in Job.description.
+SNIPPET_MARKER = "\n\n---\nSERP snippet:\n"
+
 class Job(BaseModel):
     id: str
     title: str
@@ -11,9 +14,15 @@ class Job(BaseModel):
     url: str
     source: str  # google_jobs|linkedin
     description: str = ""
+    desc_len: int = 0  # characters in the stored description, which listings leave out
     salary: str = ""
     llm_score: Optional[float] = None
     llm_blurb: Optional[str] = None
+    llm_model: Optional[str] = None  # model and prompt version behind llm_score, so stale scores can be redone
+    prompt_version: Optional[str] = None
+    local_score: Optional[float] = None
+    duplicate_of: Optional[str] = None  # canonical job ID when this is a near-duplicate listing
+    duplicate_count: int = 0
     assessment_flag: int = 0
     assessment_terms: str = ""
     status: str = "harvested"
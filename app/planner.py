@@ -0,0 +1,204 @@
+import math
+import sqlite3
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, NamedTuple
+from zoneinfo import ZoneInfo
+from .metrics import DB_WRITE_SECONDS
+from .settings import settings
+
+# Weight of the latest run in the recent_new/recent_credits moving averages.
+EWMA_ALPHA = 0.5
+# Backoff waits are shortened by this share, so a cron that fires a few seconds early still finds the shard due.
+DUE_SLACK = 0.05
+RESULTS_PER_PAGE = 10
+
+STAT_COLUMNS = [
+    "key", "engine", "query", "location", "runs", "results", "inserted", "duplicates", "score_sum", "scored",
+    "credits", "recent_new", "recent_credits", "dead_streak", "last_run_at", "last_new_at",
+]
+
+
+def queries() -> List[str]:
+    extras = f" {' '.join(settings.QUERY_KEYWORDS)}" if settings.QUERY_KEYWORDS else ""
+    return [f"{t}{extras}".strip() for t in (settings.QUERY_TITLES or [])]
+
+
+def today() -> str:
+    return datetime.now(ZoneInfo(settings.TZ)).date().isoformat()
+
+
+def _runs(n: int) -> str:
+    return f"{n} run{'s' if n != 1 else ''}"
+
+
+def _when(ts: float | None) -> str | None:
+    return datetime.fromtimestamp(ts, ZoneInfo(settings.TZ)).isoformat(timespec="minutes") if ts else None
+
+
+class Decision(NamedTuple):
+    shard: Any  # harvest.Shard
+    run: bool
+    reason: str
+    priority: float
+    est_credits: int
+    due_at: float | None
+    stats: Dict[str, Any]
+
+    def as_dict(self) -> Dict[str, Any]:
+        s = self.shard
+        return {
+            "key": s.key, "engine": s.source.engine, "query": s.query, "location": s.location,
+            "run": self.run, "reason": self.reason,
+            "priority": None if math.isinf(self.priority) else round(self.priority, 4),
+            "est_credits": self.est_credits, "due_at": _when(self.due_at),
+            "stats": {k: v for k, v in self.stats.items() if k not in ("key", "engine", "query", "location")},
+        }
+
+
+class QueryPlanner:
+    """Decides which search shards (engine × query × location) a run spends SerpAPI credits on.
+
+    Every finished shard records its yield in ``query_stats``: results, new jobs, duplicates, average LLM score
+    and credits (requests that missed the SerpAPI cache). Shards without history always run. A shard whose
+    last runs inserted nothing backs off exponentially (``PLANNER_BACKOFF_BASE_HOURS`` doubling per dry run, up
+    to ``PLANNER_BACKOFF_MAX_HOURS``). Due shards are ranked by recent new jobs per credit, weighted by average
+    score, and admitted until ``SERP_DAILY_CREDIT_BUDGET`` for the day is spent.
+    """
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        rows = self.conn.execute(f"SELECT {','.join(STAT_COLUMNS)} FROM query_stats").fetchall()
+        return {r[0]: dict(zip(STAT_COLUMNS, r)) for r in rows}
+
+    def credits_today(self) -> int:
+        row = self.conn.execute("SELECT credits FROM serp_usage WHERE day=?", (today(),)).fetchone()
+        return row[0] if row else 0
+
+    @staticmethod
+    def _estimate(shard, st: Dict[str, Any] | None) -> int:
+        if st and st["runs"]:
+            return max(1, math.ceil(st["recent_credits"]))
+        # First run backfills: every page up to the shard's result cap.
+        return math.ceil(max(0, shard.max_results) / RESULTS_PER_PAGE)
+
+    @staticmethod
+    def _due_at(st: Dict[str, Any]) -> float:
+        if not st["dead_streak"]:
+            return st["last_run_at"] or 0.0
+        hours = min(settings.PLANNER_BACKOFF_MAX_HOURS, settings.PLANNER_BACKOFF_BASE_HOURS * 2 ** (st["dead_streak"] - 1))
+        return (st["last_run_at"] or 0.0) + hours * 3600 * (1 - DUE_SLACK)
+
+    def plan(self, shards: Iterable, now: float | None = None) -> List[Decision]:
+        """One decision per shard, in the given order."""
+        shards = list(shards)
+        now = now or time.time()
+        history = self.stats()
+        if not settings.ENABLE_QUERY_PLANNER:
+            return [Decision(s, True, "planner disabled", 0.0, self._estimate(s, history.get(s.key)), None,
+                             history.get(s.key) or {}) for s in shards]
+        out: List[Decision] = []
+        candidates: List[Decision] = []
+        for s in shards:
+            st = history.get(s.key)
+            est = self._estimate(s, st)
+            if not st or not st["runs"]:
+                candidates.append(Decision(s, True, "new: no history yet", math.inf, est, None, st or {}))
+                continue
+            due_at = self._due_at(st)
+            if now < due_at:
+                out.append(Decision(s, False, f"backoff: {_runs(st['dead_streak'])} in a row without new jobs, "
+                                              f"next try {_when(due_at)}", 0.0, est, due_at, st))
+                continue
+            avg_score = st["score_sum"] / st["scored"] if st["scored"] else None
+            value = st["recent_new"] * (avg_score / 100 if avg_score is not None else 0.5)
+            if st["dead_streak"]:
+                reason = f"probe: due again after {_runs(st['dead_streak'])} without new jobs"
+            else:
+                reason = (f"productive: {st['recent_new']:.1f} new jobs/run recently"
+                          f"{f', avg score {avg_score:.0f}' if avg_score is not None else ''}, ~{est} credits")
+            candidates.append(Decision(s, True, reason, value / max(1, est), est, due_at, st))
+        budget = settings.SERP_DAILY_CREDIT_BUDGET
+        used = self.credits_today()
+        left = budget - used if budget > 0 else math.inf
+        # Best yield per credit first; sorted() is stable, so ties keep the configured order.
+        for d in sorted(candidates, key=lambda d: -d.priority):
+            if d.est_credits > left:
+                out.append(d._replace(run=False, reason=f"over budget: {used}/{budget} credits used today, "
+                                                        f"{max(0, left):.0f} left, needs ~{d.est_credits} ({d.reason})"))
+                continue
+            left -= d.est_credits
+            out.append(d)
+        order = {s.key: i for i, s in enumerate(shards)}
+        out.sort(key=lambda d: order[d.shard.key])
+        return out
+
+    def report(self, shards: Iterable) -> Dict[str, Any]:
+        """The schedule the next run would get, with the reason for every shard (``GET /plan``)."""
+        decisions = self.plan(shards)
+        return {
+            "day": today(),
+            "enabled": settings.ENABLE_QUERY_PLANNER,
+            "credit_budget": settings.SERP_DAILY_CREDIT_BUDGET,
+            "credits_used_today": self.credits_today(),
+            "credits_planned": sum(d.est_credits for d in decisions if d.run),
+            "run": sum(d.run for d in decisions),
+            "skip": sum(not d.run for d in decisions),
+            "shards": [d.as_dict() for d in decisions],
+        }
+
+    def record(self, shard, started: float, results: int, credits: int, duplicates: int, inserted: int,
+               scores: List[float], failed: bool = False) -> None:
+        """Fold one finished shard into its ``query_stats`` row and the day's ``serp_usage``.
+
+        A ``failed`` search that inserted nothing (SerpAPI error, quota, missing key) only books its credits,
+        and so does one answered entirely from the SerpAPI cache (no credits): neither says anything new about
+        the shard's yield, so it must not count as a dry run and start a backoff.
+        """
+        with DB_WRITE_SECONDS.time(op="planner"), self.conn:
+            if not inserted and (failed or not credits):
+                self._add_credits(credits)
+                return
+            row = self.conn.execute(
+                "SELECT runs, recent_new, recent_credits, dead_streak, last_new_at FROM query_stats WHERE key=?",
+                (shard.key,),
+            ).fetchone()
+            runs, recent_new, recent_credits, dead_streak, last_new_at = row or (0, 0.0, 0.0, 0, None)
+            if runs:
+                recent_new = EWMA_ALPHA * inserted + (1 - EWMA_ALPHA) * recent_new
+                recent_credits = EWMA_ALPHA * credits + (1 - EWMA_ALPHA) * recent_credits
+            else:
+                recent_new, recent_credits = float(inserted), float(credits)
+            self.conn.execute(
+                """
+                INSERT INTO query_stats(key, engine, query, location, runs, results, inserted, duplicates, score_sum,
+                                        scored, credits, recent_new, recent_credits, dead_streak, last_run_at, last_new_at)
+                VALUES(?,?,?,?,1,?,?,?,?,?,?,?,?,?,?,?)
+                ON CONFLICT(key) DO UPDATE SET
+                  runs=runs+1, results=results+excluded.results, inserted=inserted+excluded.inserted,
+                  duplicates=duplicates+excluded.duplicates, score_sum=score_sum+excluded.score_sum,
+                  scored=scored+excluded.scored, credits=credits+excluded.credits,
+                  recent_new=excluded.recent_new, recent_credits=excluded.recent_credits,
+                  dead_streak=excluded.dead_streak, last_run_at=excluded.last_run_at, last_new_at=excluded.last_new_at
+                """,
+                (shard.key, shard.source.engine, shard.query, shard.location, results, inserted, duplicates,
+                 sum(scores), len(scores), credits, recent_new, recent_credits,
+                 0 if inserted else dead_streak + 1, started, time.time() if inserted else last_new_at),
+            )
+            self._add_credits(credits)
+
+    def record_scores(self, scores: Iterable[tuple[str, float]]) -> None:
+        """Book ``(shard key, llm_score)`` pairs that were scored after their shard was recorded."""
+        with DB_WRITE_SECONDS.time(op="planner"), self.conn:
+            self.conn.executemany("UPDATE query_stats SET score_sum=score_sum+?, scored=scored+1 WHERE key=?",
+                                  [(score, key) for key, score in scores])
+
+    def _add_credits(self, credits: int) -> None:
+        if credits:
+            self.conn.execute(
+                "INSERT INTO serp_usage(day, credits) VALUES(?,?) "
+                "ON CONFLICT(day) DO UPDATE SET credits=credits+excluded.credits",
+                (today(), credits),
+            )
@@ -0,0 +1,45 @@
+import re
+import zlib
+from typing import List
+
+TOKEN_PAT = re.compile(r"[a-z0-9][a-z0-9+#]*")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our the this to we will with you your".split()
+)
+
+
+def _features(text: str) -> List[str]:
+    toks = [t for t in TOKEN_PAT.findall((text or "").lower()) if len(t) > 1 and t not in STOPWORDS]
+    return toks + [f"{a} {b}" for a, b in zip(toks, toks[1:])]
+
+
+def similarity(docs: List[str], profile: str, dim_bits: int = 18) -> "np.ndarray":
+    """Cosine similarity of each doc to ``profile`` using hashed, sublinear TF-IDF over unigrams + bigrams.
+
+    IDF is fitted on the batch itself (docs + profile), so all candidates of a run are scored in one pass.
+    """
+    import numpy as np
+    n = len(docs)
+    if n == 0:
+        return np.zeros(0)
+    dim = 1 << dim_bits
+    rows: List[int] = []
+    cols: List[int] = []
+    for i, text in enumerate([*docs, profile]):
+        hashed = [zlib.crc32(f.encode("utf-8")) & (dim - 1) for f in _features(text)]
+        cols.extend(hashed)
+        rows.extend([i] * len(hashed))
+    if not cols:
+        return np.zeros(n)
+    keys = np.asarray(rows, dtype=np.int64) * dim + np.asarray(cols, dtype=np.int64)
+    uniq, tf = np.unique(keys, return_counts=True)
+    r, c = uniq // dim, uniq % dim
+    df = np.bincount(c, minlength=dim)
+    w = (1.0 + np.log(tf)) * (np.log((n + 2) / (df[c] + 1.0)) + 1.0)
+    norms = np.sqrt(np.bincount(r, weights=w * w, minlength=n + 1))
+    profile_vec = np.zeros(dim)
+    mine = r == n
+    profile_vec[c[mine]] = w[mine]
+    dots = np.bincount(r, weights=w * profile_vec[c], minlength=n + 1)[:n]
+    denom = norms[:n] * norms[n]
+    return np.divide(dots, denom, out=np.zeros(n), where=denom > 0)
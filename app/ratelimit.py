@@ -0,0 +1,75 @@
+import sqlite3
+import threading
+import time
+from .db import connect
+
+
+class TokenBucket:
+    """Thread-safe token bucket; ``rate`` tokens/sec refill up to ``burst``. A rate <= 0 disables limiting."""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class SharedTokenBucket(TokenBucket):
+    """Token bucket kept in the ``rate_limits`` row ``name``, so every process sharing the database draws on one
+    rate (``uvicorn --workers N``, several containers). Falls back to the in-process bucket while the database
+    is locked, so a busy writer slows the limiter down instead of failing searches."""
+
+    def __init__(self, name: str, rate: float, burst: int = 1):
+        super().__init__(rate, burst)
+        self.name = name
+        self._conn = None
+
+    def _db(self):
+        if self._conn is None:
+            self._conn = connect()
+        return self._conn
+
+    def _take(self, tokens: float) -> float:
+        """Take ``tokens`` if the shared bucket has them; otherwise return the seconds until it will."""
+        with self._lock:
+            conn = self._db()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT tokens, updated FROM rate_limits WHERE name=?", (self.name,)).fetchone()
+                now = time.time()
+                have = self.capacity if row is None else min(self.capacity, row[0] + max(0.0, now - row[1]) * self.rate)
+                wait = 0.0 if have >= tokens else (tokens - have) / self.rate
+                conn.execute("INSERT OR REPLACE INTO rate_limits(name, tokens, updated) VALUES(?,?,?)",
+                             (self.name, have - tokens if not wait else have, now))
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+        return wait
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            try:
+                wait = self._take(tokens)
+            except sqlite3.OperationalError:
+                return super().acquire(tokens)
+            if not wait:
+                return
+            time.sleep(wait)
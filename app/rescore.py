@@ -0,0 +1,132 @@
+import os
+import socket
+import threading
+import time
+from typing import Any, Dict
+from rich import print as rprint
+from .agent import LLMScorer, TokenBudget, prompt_version
+from .context import context
+from .db import acquire_lease, connect, release_lease
+from .harvest import Store
+from .metrics import RESCORED_JOBS
+from .scorecache import ScoreCache
+from .settings import settings
+
+LEASE = "rescore"
+
+
+class Rescorer:
+    """Re-scores stored jobs whose ``llm_score`` came from another ``LLM_MODEL`` or prompt version.
+
+    Canonical jobs are read in rowid chunks of ``RESCORE_CHUNK_SIZE``, scored ``LLM_CONCURRENCY`` at a time,
+    and each chunk is written back in one transaction together with the model and prompt version that
+    produced it. An interrupted rescore therefore resumes where it stopped: the next one only finds the rows
+    that are still stale. The ``rescore`` lease keeps it to one process at a time.
+    """
+
+    def __init__(self):
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.last: Dict[str, Any] | None = None
+
+    def _heartbeat(self, stop: threading.Event) -> None:
+        conn = connect()
+        try:
+            while not stop.wait(max(1, settings.LEADER_LEASE_SECS // 3)):
+                acquire_lease(conn, LEASE, self.owner, settings.LEADER_LEASE_SECS)
+        finally:
+            conn.close()
+
+    def _holder(self, store: Store | None = None) -> str | None:
+        row = (store or context.store).conn.execute(
+            "SELECT owner FROM leases WHERE name=? AND expires_at >= ?", (LEASE, time.time()),
+        ).fetchone()
+        return row[0] if row else None
+
+    def run(self, include_unscored: bool = False, limit: int = 0) -> Dict[str, Any]:
+        """Rescore stale jobs in this thread. ``include_unscored`` also scores jobs that never got an LLM score."""
+        store = Store()
+        try:
+            llm = LLMScorer(cache=ScoreCache(store.conn))
+            if not llm.enabled:
+                return {"status": "skipped", "reason": "LLM scoring is not configured"}
+            if not acquire_lease(store.conn, LEASE, self.owner, settings.LEADER_LEASE_SECS):
+                return {"status": "already_running", "owner": self._holder(store)}
+            stop = threading.Event()
+            threading.Thread(target=self._heartbeat, args=(stop,), daemon=True).start()
+            state = self.last = {
+                "status": "running", "model": llm.model, "prompt_version": llm.prompt_version,
+                "started_at": time.time(), "finished_at": None,
+                "stale": store.count_stale_scores(llm.model, llm.prompt_version, include_unscored),
+                "scanned": 0, "rescored": 0, "failed": 0, "llm_tokens": 0, "llm_budget_exhausted": False,
+            }
+            budget = TokenBudget.from_settings()
+            try:
+                chunks = store.stale_scores(llm.model, llm.prompt_version, max(1, settings.RESCORE_CHUNK_SIZE),
+                                            include_unscored)
+                for chunk in chunks:
+                    if limit:
+                        chunk = chunk[:limit - state["scanned"]]
+                    for job in chunk:
+                        # Score from the same inputs a fresh harvest would send, not the old score.
+                        job.llm_score = job.llm_blurb = job.llm_model = job.prompt_version = None
+                    llm.score_many(chunk, mode="concurrent", budget=budget)
+                    done = [j for j in chunk if j.llm_score is not None]
+                    for job in done:
+                        job.llm_model, job.prompt_version = llm.model, llm.prompt_version
+                        if settings.ENABLE_ASSESSMENT_BOOST and job.assessment_flag:
+                            job.llm_score = min(job.llm_score + settings.ASSESSMENT_SCORE_BOOST, 100.0)
+                    store.save_scores(done)
+                    RESCORED_JOBS.inc(len(done), outcome="rescored")
+                    RESCORED_JOBS.inc(len(chunk) - len(done), outcome="failed")
+                    state.update(scanned=state["scanned"] + len(chunk), rescored=state["rescored"] + len(done),
+                                 failed=state["failed"] + len(chunk) - len(done), llm_tokens=budget.used)
+                    if budget.exhausted or (limit and state["scanned"] >= limit):
+                        break
+                state.update(status="finished", llm_budget_exhausted=budget.exhausted)
+            except Exception as exc:
+                state.update(status="failed", error=str(exc))
+                raise
+            finally:
+                state["finished_at"] = time.time()
+                stop.set()
+                release_lease(store.conn, LEASE, self.owner)
+            rprint(f"[green]Rescored {state['rescored']} of {state['scanned']} jobs with {llm.model} "
+                   f"(prompt {llm.prompt_version}).[/green]")
+            if state["failed"]:
+                rprint(f"[yellow]{state['failed']} jobs kept their old score; run the rescore again to retry them.[/yellow]")
+            if budget.exhausted:
+                rprint("[yellow]LLM token budget exhausted; the rest stays stale until the next rescore.[/yellow]")
+            return dict(state)
+        finally:
+            store.conn.close()
+
+    def _run_quietly(self, include_unscored: bool, limit: int) -> None:
+        try:
+            self.run(include_unscored, limit)
+        except Exception as exc:
+            rprint(f"[red]Rescore failed: {exc}[/red]")
+
+    def start(self, include_unscored: bool = False, limit: int = 0) -> Dict[str, Any]:
+        """Start a rescore in a background thread (``POST /rescore``)."""
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return {"status": "already_running", "owner": self.owner}
+            holder = self._holder()
+            if holder:
+                return {"status": "already_running", "owner": holder}
+            self._thread = threading.Thread(target=self._run_quietly, args=(include_unscored, limit), daemon=True)
+            self._thread.start()
+        return {"status": "started", "owner": self.owner}
+
+    def status(self, include_unscored: bool = False) -> Dict[str, Any]:
+        version = prompt_version()
+        return {
+            "model": settings.LLM_MODEL, "prompt_version": version,
+            "stale": context.store.count_stale_scores(settings.LLM_MODEL, version, include_unscored),
+            "running": self._holder(), "last": self.last,
+        }
+
+
+rescorer = Rescorer()
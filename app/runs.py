@@ -0,0 +1,376 @@
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List
+from rich import print as rprint
+from .db import acquire_lease, connect
+from .context import context
+from .harvest import RunProgress
+from .metrics import REGISTRY, RUN_SECONDS, RUNS
+from .settings import settings
+
+
+# Summed across workers when a run's per-worker results are merged, except these.
+MAX_RESULT_FIELDS = {"shards_resumed", "shards_skipped"}
+
+
+def merge_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {"csv": None, "csv_files": []}
+    for res in results:
+        for key, value in res.items():
+            if key == "csv":
+                if value:
+                    out["csv"] = out["csv"] or value
+                    out["csv_files"].append(value)
+            elif isinstance(value, bool):
+                out[key] = out.get(key, False) or value
+            elif isinstance(value, (int, float)):
+                out[key] = max(out.get(key, 0), value) if key in MAX_RESULT_FIELDS else out.get(key, 0) + value
+    return out
+
+
+class RunManager:
+    """Single-flight harvest runs shared by the API, the scheduler, the CLI and every worker process.
+
+    A lock guards runs inside this process. Across processes sharing the database, the ``runs`` table
+    decides: a ``running`` row with a fresh heartbeat means a run is already active, and callers get
+    that run's ID back instead of starting a second harvest. A ``running`` row whose heartbeat went
+    stale less than ``RUN_RESUME_WINDOW_SECS`` ago is taken over and resumed from its ``run_items``.
+
+    A run's shards are a work queue: each process that joins (see ``work_once``) leases shards from
+    ``run_items``, so more workers finish a run sooner without repeating it. Each worker records its
+    progress and result in ``run_workers``; whichever finishes last marks the run finished.
+    """
+
+    def __init__(self):
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._lock = threading.Lock()
+        self._conn = None
+        self._active: tuple[str, RunProgress] | None = None
+        self._worker: threading.Thread | None = None
+
+    def _db(self):
+        if self._conn is None:
+            self._conn = connect()
+        return self._conn
+
+    def _claim(self, trigger: str) -> tuple[str, bool]:
+        conn = self._db()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT id, heartbeat_at FROM runs WHERE status='running' ORDER BY heartbeat_at DESC LIMIT 1"
+            ).fetchone()
+            age = now - (row[1] or 0) if row else None
+            if row and age < settings.RUN_STALE_SECS:
+                conn.commit()
+                return row[0], False
+            if row and age < settings.RUN_RESUME_WINDOW_SECS:
+                # The owner stopped heartbeating (crash/restart): take the run over and resume its checkpoints.
+                conn.execute("UPDATE runs SET owner=?, heartbeat_at=?, trigger=? WHERE id=?",
+                             (self.owner, now, trigger, row[0]))
+                # No worker has heartbeated the run, so every lease on it belongs to a dead worker.
+                conn.execute("UPDATE run_items SET status='pending', lease_owner=NULL WHERE run_id=? AND status='leased'",
+                             (row[0],))
+                conn.execute("UPDATE run_workers SET finished_at=? WHERE run_id=? AND finished_at IS NULL",
+                             (datetime.utcnow().isoformat(), row[0]))
+                conn.execute(
+                    "UPDATE runs SET status='abandoned', finished_at=? WHERE status='running' AND id<>?",
+                    (datetime.utcnow().isoformat(), row[0]),
+                )
+                conn.commit()
+                return row[0], True
+            conn.execute(
+                "UPDATE runs SET status='abandoned', finished_at=? WHERE status='running'",
+                (datetime.utcnow().isoformat(),),
+            )
+            run_id = uuid.uuid4().hex
+            conn.execute(
+                "INSERT INTO runs(id, trigger, status, owner, started_at, heartbeat_at) VALUES(?,?,?,?,?,?)",
+                (run_id, trigger, "running", self.owner, datetime.utcnow().isoformat(), now),
+            )
+            conn.commit()
+            return run_id, True
+        except Exception:
+            conn.rollback()
+            raise
+
+    def _begin(self, trigger: str) -> tuple[str, RunProgress | None]:
+        with self._lock:
+            if self._active:
+                return self._active[0], None
+            run_id, created = self._claim(trigger)
+            if not created:
+                return run_id, None
+            progress = RunProgress()
+            self._active = (run_id, progress)
+            return run_id, progress
+
+    def start(self, trigger: str) -> Dict[str, Any]:
+        """Start a harvest in a background thread, or return the run that is already active."""
+        run_id, progress = self._begin(trigger)
+        if progress is None:
+            return {"run_id": run_id, "status": "running", "already_running": True}
+        threading.Thread(target=self._execute, args=(run_id, progress), name=f"harvest-{run_id[:8]}", daemon=True).start()
+        return {"run_id": run_id, "status": "running", "already_running": False}
+
+    def run(self, trigger: str) -> Dict[str, Any]:
+        """Run a harvest in the calling thread and return its final status."""
+        run_id, progress = self._begin(trigger)
+        if progress is None:
+            return {"run_id": run_id, "status": "running", "already_running": True}
+        self._execute(run_id, progress)
+        return self.status(run_id) or {"run_id": run_id}
+
+    def _execute(self, run_id: str, progress: RunProgress) -> None:
+        with self._lock:
+            self._db().execute(
+                "INSERT OR REPLACE INTO run_workers(run_id, owner, joined_at, heartbeat_at) VALUES(?,?,?,?)",
+                (run_id, self.owner, datetime.utcnow().isoformat(), time.time()),
+            )
+            self._db().commit()
+        stop = threading.Event()
+        beat = threading.Thread(target=self._heartbeat, args=(run_id, progress, stop), daemon=True)
+        beat.start()
+        result, error = None, None
+        before = REGISTRY.snapshot()
+        try:
+            result = context.runner.run_once(progress=progress, run_id=run_id, owner=self.owner)
+        except Exception as exc:
+            error = repr(exc)
+        finally:
+            stop.set()
+            beat.join()
+            # Metrics are process-wide; the delta over this worker's part is its share of the run.
+            deltas = [(run_id, name, value - before.get(name, 0.0))
+                      for name, value in REGISTRY.snapshot().items() if value != before.get(name, 0.0)]
+            with self._lock:
+                try:
+                    self._report(run_id, progress, result, error, deltas)
+                    self._finalize(run_id, failed=bool(error))
+                except Exception as exc:
+                    self._db().rollback()
+                    rprint(f"[red]Could not record this worker's part of run {run_id[:8]}[/red]: {exc}")
+                finally:
+                    # Always free this process for the next run, even if the database was busy or broken.
+                    self._active = None
+
+    def _report(self, run_id: str, progress: RunProgress, result: Dict[str, Any] | None, error: str | None,
+                deltas: List[tuple]) -> None:
+        """Store this worker's metrics, progress and result or error. Caller holds the lock.
+
+        A failed worker hands its leased shards back (or fails them after ``SHARD_MAX_ATTEMPTS``), so the
+        run's other workers finish them instead of waiting for the leases to expire.
+        """
+        conn = self._db()
+        conn.executemany(
+            "INSERT INTO run_metrics(run_id, name, value) VALUES(?,?,?) "
+            "ON CONFLICT(run_id, name) DO UPDATE SET value = value + excluded.value",
+            deltas,
+        )
+        conn.execute(
+            "UPDATE run_workers SET finished_at=?, heartbeat_at=?, progress=?, result=?, error=? "
+            "WHERE run_id=? AND owner=?",
+            (datetime.utcnow().isoformat(), time.time(), json.dumps(progress.snapshot()),
+             None if error else json.dumps(result or {}), error, run_id, self.owner),
+        )
+        if error:
+            conn.execute(
+                "UPDATE run_items SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "lease_owner=NULL WHERE run_id=? AND lease_owner=? AND status='leased'",
+                (max(1, settings.SHARD_MAX_ATTEMPTS), run_id, self.owner),
+            )
+        conn.commit()
+
+    def _close(self, run_id: str, status: str, result: Dict[str, Any] | None = None,
+               progress: Dict[str, Any] | None = None, error: str | None = None) -> bool:
+        """Move a running run to its final ``status``; False if another worker already did. Caller holds the lock."""
+        conn = self._db()
+        row = conn.execute(
+            "UPDATE runs SET status=?, finished_at=?, heartbeat_at=?, progress=COALESCE(?, progress), result=?, error=? "
+            "WHERE id=? AND status='running' RETURNING started_at",
+            (status, datetime.utcnow().isoformat(), time.time(), json.dumps(progress) if progress else None,
+             json.dumps(result) if result is not None else None, error, run_id),
+        ).fetchone()
+        conn.commit()
+        if row:
+            RUNS.inc(status=status)
+            RUN_SECONDS.observe((datetime.utcnow() - datetime.fromisoformat(row[0])).total_seconds())
+        return bool(row)
+
+    def _finalize(self, run_id: str, failed: bool = False) -> None:
+        """Close the run once every live worker has reported. Caller holds the lock.
+
+        Normally that is when no shard is left. A ``failed`` worker that was the last one alive closes the run
+        as failed even with shards left, since nobody would pick them up. The run is ``failed`` when no worker
+        succeeded, and ``finished`` otherwise, with the failed workers' errors kept in ``error``.
+        """
+        conn = self._db()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            open_items = conn.execute(
+                "SELECT COUNT(*) FROM run_items WHERE run_id=? AND status IN ('pending','leased')", (run_id,)
+            ).fetchone()[0]
+            busy = conn.execute(
+                "SELECT COUNT(*) FROM run_workers WHERE run_id=? AND finished_at IS NULL AND heartbeat_at > ?",
+                # A worker silent for a whole lease is gone; its shards are claimable again.
+                (run_id, time.time() - settings.SHARD_LEASE_SECS),
+            ).fetchone()[0]
+            if busy or (open_items and not failed):
+                conn.commit()
+                return
+            workers = conn.execute(
+                "SELECT progress, result, error FROM run_workers WHERE run_id=? AND (result IS NOT NULL OR error IS NOT NULL)",
+                (run_id,),
+            ).fetchall()
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        progress = self._merge_progress(run_id, [json.loads(p or "{}") for p, _, _ in workers])
+        progress["stage"] = "done"
+        results = [json.loads(r) for _, r, _ in workers if r is not None]
+        errors = "; ".join(e for _, _, e in workers if e) or None
+        self._close(run_id, "failed" if open_items or not results else "finished", result=merge_results(results),
+                    progress=progress, error=errors)
+
+    def _merge_progress(self, run_id: str, parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+        out: Dict[str, Any] = dict.fromkeys(RunProgress.FIELDS, 0)
+        for part in parts:
+            for key in RunProgress.FIELDS:
+                out[key] += part.get(key, 0)
+        total, done = self._db().execute(
+            "SELECT COUNT(*), COALESCE(SUM(status IN ('done','failed')), 0) FROM run_items WHERE run_id=?", (run_id,)
+        ).fetchone()
+        if total:
+            out["searches_total"], out["searches_done"] = total, done
+        return out
+
+    def _heartbeat(self, run_id: str, progress: RunProgress, stop: threading.Event) -> None:
+        while not stop.wait(settings.RUN_HEARTBEAT_SECS):
+            now = time.time()
+            with self._lock:
+                conn = self._db()
+                try:
+                    conn.execute("UPDATE runs SET heartbeat_at=? WHERE id=?", (now, run_id))
+                    conn.execute(
+                        "UPDATE run_workers SET heartbeat_at=?, progress=? WHERE run_id=? AND owner=?",
+                        (now, json.dumps(progress.snapshot()), run_id, self.owner),
+                    )
+                    # Extend the leases of shards this worker still holds.
+                    conn.execute(
+                        "UPDATE run_items SET lease_expires=? WHERE run_id=? AND lease_owner=? AND status='leased'",
+                        (now + settings.SHARD_LEASE_SECS, run_id, self.owner),
+                    )
+                    conn.commit()
+                except Exception as exc:
+                    # Keep beating: a dead heartbeat lets the leases lapse while this worker still runs its shards.
+                    conn.rollback()
+                    rprint(f"[yellow]Heartbeat for run {run_id[:8]} failed, retrying[/yellow]: {exc}")
+
+    def _joinable(self) -> str | None:
+        """A running run, fresh or within the resume window, that still has shards nobody holds a live lease on."""
+        now = time.time()
+        row = self._db().execute(
+            """
+            SELECT r.id FROM runs r
+            WHERE r.status='running' AND r.heartbeat_at > ?
+              AND EXISTS (SELECT 1 FROM run_items i WHERE i.run_id = r.id
+                          AND (i.status='pending' OR (i.status='leased' AND i.lease_expires < ?)))
+            ORDER BY r.started_at DESC LIMIT 1
+            """,
+            (now - settings.RUN_RESUME_WINDOW_SECS, now),
+        ).fetchone()
+        return row[0] if row else None
+
+    def work_once(self) -> str | None:
+        """Join an active run that has unclaimed shards and work on it until none are left; return its ID."""
+        with self._lock:
+            if self._active:
+                return None
+            run_id = self._joinable()
+            if not run_id:
+                return None
+            progress = RunProgress()
+            self._active = (run_id, progress)
+            self._db().execute("UPDATE runs SET heartbeat_at=? WHERE id=?", (time.time(), run_id))
+            self._db().commit()
+        rprint(f"[dim]Worker {self.owner} joining run {run_id[:8]}[/dim]")
+        self._execute(run_id, progress)
+        return run_id
+
+    def work_forever(self) -> None:
+        while True:
+            try:
+                self.work_once()
+            except Exception as exc:
+                rprint(f"[red]Worker poll failed[/red]: {exc}")
+            time.sleep(max(1, settings.WORKER_POLL_SECS))
+
+    def start_worker(self) -> None:
+        """Poll for runs started by other processes in a background thread (``WORKER_POLL_SECS=0`` disables)."""
+        if settings.WORKER_POLL_SECS <= 0 or self._worker:
+            return
+        self._worker = threading.Thread(target=self.work_forever, name="harvest-worker", daemon=True)
+        self._worker.start()
+
+    def try_lead(self, name: str) -> bool:
+        """Acquire or renew the ``name`` lease for this process; True while it is the leader."""
+        with self._lock:
+            return acquire_lease(self._db(), name, self.owner, settings.LEADER_LEASE_SECS)
+
+    def _row(self, row: tuple) -> Dict[str, Any]:
+        return {
+            "run_id": row[0], "trigger": row[1], "status": row[2], "owner": row[3],
+            "started_at": row[4], "finished_at": row[5],
+            "progress": json.loads(row[6] or "{}"),
+            "result": json.loads(row[7]) if row[7] else None,
+            "error": row[8],
+        }
+
+    def status(self, run_id: str) -> Dict[str, Any] | None:
+        with self._lock:
+            row = self._db().execute(
+                "SELECT id, trigger, status, owner, started_at, finished_at, progress, result, error FROM runs WHERE id=?",
+                (run_id,),
+            ).fetchone()
+            metrics = self._db().execute(
+                "SELECT name, value FROM run_metrics WHERE run_id=? ORDER BY name", (run_id,)
+            ).fetchall()
+            active = self._active
+            workers = self._db().execute(
+                "SELECT owner, joined_at, finished_at, progress, error FROM run_workers WHERE run_id=? ORDER BY joined_at",
+                (run_id,),
+            ).fetchall()
+            if not row:
+                return None
+            out = self._row(row)
+            live = []
+            for owner, joined_at, finished_at, prog, error in workers:
+                prog = json.loads(prog or "{}")
+                if active and active[0] == run_id and owner == self.owner:
+                    prog = active[1].snapshot()
+                live.append({"owner": owner, "joined_at": joined_at, "finished_at": finished_at, "progress": prog,
+                             "error": error})
+            if out["status"] == "running" and live:
+                out["progress"] = {"stage": "harvest", **self._merge_progress(run_id, [w["progress"] for w in live])}
+        out["metrics"] = dict(metrics)
+        out["workers"] = live
+        return out
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT id, trigger, status, owner, started_at, finished_at, progress, result, error "
+                "FROM runs ORDER BY started_at DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [self._row(r) for r in rows]
+
+
+run_manager = RunManager()
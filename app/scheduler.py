@@ -1,6 +1,7 @@
+from datetime import datetime, timezone
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
-from .harvest import Runner
+from .runs import run_manager
 from .settings import settings
 
 def _cron_triggers():
@@ -18,7 +19,14 @@ def _cron_triggers():
     return triggers
 
 _sched = None
-_runner = Runner()
+
+def _renew_leadership():
+    run_manager.try_lead("scheduler")
+
+def _fire():
+    # Every process schedules the crons, but only the leader triggers; the others join through their worker.
+    if run_manager.try_lead("scheduler"):
+        run_manager.start("cron")
 
 def start_scheduler():
     global _sched
@@ -26,6 +34,8 @@ def start_scheduler():
         return _sched
     _sched = BackgroundScheduler(timezone=settings.TZ)
     for trig in _cron_triggers():
-        _sched.add_job(_runner.run_once, trig)
+        _sched.add_job(_fire, trig)
+    _sched.add_job(_renew_leadership, "interval", seconds=max(1, settings.LEADER_LEASE_SECS // 3),
+                   next_run_time=datetime.now(timezone.utc))
     _sched.start()
     return _sched
@@ -0,0 +1,61 @@
+import hashlib
+import sqlite3
+import time
+from typing import Tuple
+from .metrics import CACHE_REQUESTS
+from .models import Job, SNIPPET_MARKER
+from .settings import settings
+
+
+def _norm(s: str | None) -> str:
+    return " ".join((s or "").lower().split())
+
+
+def cache_key(job: Job, model: str, prompt_version: str) -> str:
+    # The SERP snippet differs between sources/locations for the same posting, so only the page text is keyed.
+    desc = (job.description or "").split(SNIPPET_MARKER)[0]
+    h = hashlib.sha256()
+    for part in (_norm(job.title), _norm(job.company), _norm(desc), model, prompt_version):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+
+class ScoreCache:
+    """Content-addressed ``llm_score``/``llm_blurb`` cache stored in the ``llm_cache`` table."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Tuple[float, str] | None:
+        row = self.conn.execute("SELECT score, blurb, created_at FROM llm_cache WHERE key=?", (key,)).fetchone()
+        ttl = settings.LLM_CACHE_TTL_DAYS * 86400
+        if row and (ttl <= 0 or time.time() - row[2] <= ttl):
+            self.hits += 1
+            CACHE_REQUESTS.inc(cache="llm", result="hit")
+            return row[0], row[1] or ""
+        self.misses += 1
+        CACHE_REQUESTS.inc(cache="llm", result="miss")
+        return None
+
+    def put(self, key: str, score: float, blurb: str) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO llm_cache(key, score, blurb, created_at) VALUES(?,?,?,?)",
+            (key, score, blurb, time.time()),
+        )
+        self.conn.commit()
+
+    def evict(self) -> int:
+        removed = 0
+        if settings.LLM_CACHE_TTL_DAYS > 0:
+            cutoff = time.time() - settings.LLM_CACHE_TTL_DAYS * 86400
+            removed += self.conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (cutoff,)).rowcount
+        if settings.LLM_CACHE_MAX_ROWS > 0:
+            removed += self.conn.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (settings.LLM_CACHE_MAX_ROWS,),
+            ).rowcount
+        self.conn.commit()
+        return removed
@@ -1,20 +1,102 @@
-from bs4 import BeautifulSoup
-import requests
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable
+from urllib.parse import urlsplit
+from .metrics import SCRAPE_BYTES, SCRAPE_PAGES, SCRAPE_SECONDS
 from .settings import settings
 
 NOISE_TAGS = ["script","style","noscript","header","footer","nav","svg"]
+HTML_TYPES = ("text/html", "application/xhtml+xml")
+CHUNK_BYTES = 16384
+
+_session = None  # requests.Session, created on the first fetch
+_session_lock = threading.Lock()
+_host_slots: Dict[str, threading.BoundedSemaphore] = {}
+_host_lock = threading.Lock()
+
+
+def _get_session() -> "requests.Session":
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            s = requests.Session()
+            pool = max(10, settings.SCRAPE_CONCURRENCY)
+            adapter = HTTPAdapter(pool_connections=pool, pool_maxsize=pool)
+            s.mount("http://", adapter)
+            s.mount("https://", adapter)
+            s.headers.update({"User-Agent": "Mozilla/5.0"})
+            _session = s
+        return _session
+
+
+def _host_slot(url: str) -> threading.BoundedSemaphore:
+    host = (urlsplit(url).hostname or "").lower()
+    with _host_lock:
+        slot = _host_slots.get(host)
+        if slot is None:
+            slot = _host_slots[host] = threading.BoundedSemaphore(max(1, settings.SCRAPE_PER_HOST_LIMIT))
+        return slot
+
+
+def _read_capped(resp: "requests.Response", limit: int) -> bytes:
+    buf = bytearray()
+    for chunk in resp.iter_content(chunk_size=CHUNK_BYTES):
+        buf += chunk
+        if len(buf) >= limit:
+            break
+    return bytes(buf[:limit])
+
+
+def _html_to_text(html: str) -> str:
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "lxml")
+    for tag in soup(NOISE_TAGS):
+        tag.decompose()
+    text = " ".join(soup.get_text(" ").split())
+    return text[:20000]
 
 
 def fetch_full_description(url: str) -> str:
     if not (settings.ENABLE_FOLLOW_LINK and url):
         return ""
+    outcome = "error"
+    start = time.perf_counter()
     try:
-        resp = requests.get(url, timeout=settings.HTTP_TIMEOUT_SECS, headers={"User-Agent":"Mozilla/5.0"})
-        html = resp.text[:settings.MAX_HTML_CHARS]
-        soup = BeautifulSoup(html, "lxml")
-        for tag in soup(NOISE_TAGS):
-            tag.decompose()
-        text = " ".join(soup.get_text(" ").split())
-        return text[:20000]
+        # Only the network read holds the per-host slot; parsing happens after release.
+        with _host_slot(url):
+            with _get_session().get(url, timeout=settings.HTTP_TIMEOUT_SECS, stream=True) as resp:
+                if resp.status_code >= 400:
+                    outcome = "http_error"
+                    return ""
+                ctype = (resp.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+                if ctype and ctype not in HTML_TYPES:
+                    outcome = "not_html"
+                    return ""
+                raw = _read_capped(resp, settings.MAX_HTML_CHARS)
+                encoding = resp.encoding or "utf-8"
+        SCRAPE_BYTES.inc(len(raw))
+        outcome = "ok"
+        return _html_to_text(raw.decode(encoding, errors="replace"))
     except Exception:
         return ""
+    finally:
+        SCRAPE_SECONDS.observe(time.perf_counter() - start)
+        SCRAPE_PAGES.inc(outcome=outcome)
+
+
+def fetch_many(urls: Iterable[str], on_done: Callable[[], None] | None = None) -> Dict[str, str]:
+    unique = list(dict.fromkeys(u for u in urls if u))
+    if not (settings.ENABLE_FOLLOW_LINK and unique):
+        return {}
+
+    def work(url: str) -> str:
+        text = fetch_full_description(url)
+        if on_done:
+            on_done()
+        return text
+
+    with ThreadPoolExecutor(max_workers=max(1, settings.SCRAPE_CONCURRENCY)) as pool:
+        return dict(zip(unique, pool.map(work, unique)))
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import threading
+import time
+import zlib
+from concurrent.futures import Future
+from typing import Any, Callable, Dict
+from .db import connect
+from .metrics import CACHE_REQUESTS
+from .settings import settings
+
+
+class SerpCache:
+    """On-disk cache of raw SerpAPI JSON in the ``serp_cache`` table.
+
+    Keys are the normalized request params minus ``api_key``. Concurrent identical requests are coalesced:
+    the first caller fetches, the others wait on its result.
+    """
+
+    def __init__(self):
+        self._conn = None
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def _db(self):
+        if self._conn is None:
+            self._conn = connect()
+        return self._conn
+
+    @staticmethod
+    def key(params: Dict[str, Any]) -> str:
+        norm = {k: str(v).strip() for k, v in params.items() if k != "api_key" and v is not None}
+        return hashlib.sha256(json.dumps(norm, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def get(self, key: str, ttl: int) -> Dict[str, Any] | None:
+        with self._lock:
+            row = self._db().execute("SELECT body, fetched_at FROM serp_cache WHERE key=?", (key,)).fetchone()
+        if not row:
+            return None
+        if not settings.SERP_CACHE_OFFLINE and time.time() - row[1] > ttl:
+            return None
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key: str, engine: str, data: Dict[str, Any]) -> None:
+        body = zlib.compress(json.dumps(data).encode("utf-8"))
+        with self._lock:
+            self._db().execute(
+                "INSERT OR REPLACE INTO serp_cache(key, engine, body, size, fetched_at) VALUES(?,?,?,?,?)",
+                (key, engine, body, len(body), time.time()),
+            )
+            self._db().commit()
+
+    def _count(self, result: str) -> None:
+        # fetch() runs on every search thread; += on an attribute is not atomic.
+        with self._lock:
+            if result == "hit":
+                self.hits += 1
+            elif result == "miss":
+                self.misses += 1
+            else:
+                self.coalesced += 1
+        CACHE_REQUESTS.inc(cache="serp", result=result)
+
+    def fetch(self, params: Dict[str, Any], ttl: int, loader: Callable[[], Dict[str, Any] | None]) -> Dict[str, Any] | None:
+        """Return cached JSON for ``params`` or call ``loader`` once for all concurrent identical requests."""
+        if ttl <= 0 and not settings.SERP_CACHE_OFFLINE:
+            return loader()
+        key = self.key(params)
+        cached = self.get(key, ttl)
+        if cached is not None:
+            self._count("hit")
+            return cached
+        if settings.SERP_CACHE_OFFLINE:
+            # Replay mode never touches the network; unseen requests simply have no results.
+            self._count("miss")
+            return None
+        with self._lock:
+            fut = self._inflight.get(key)
+            owner = fut is None
+            if owner:
+                fut = self._inflight[key] = Future()
+        if not owner:
+            self._count("coalesced")
+            return fut.result()
+        try:
+            # Another caller may have filled the cache between our miss and taking ownership.
+            data = self.get(key, ttl)
+            if data is None:
+                self._count("miss")
+                data = loader()
+                if data is not None:
+                    self.put(key, params.get("engine", ""), data)
+            else:
+                self._count("hit")
+            fut.set_result(data)
+            return data
+        except Exception as exc:
+            fut.set_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def evict(self) -> int:
+        """Drop expired entries (beyond the longest engine TTL), then the oldest ones until under ``SERP_CACHE_MAX_MB``."""
+        if settings.SERP_CACHE_OFFLINE:
+            return 0
+        removed = 0
+        max_ttl = max(settings.SERP_CACHE_TTL_GOOGLE_SECS, settings.SERP_CACHE_TTL_LINKEDIN_SECS)
+        with self._lock:
+            conn = self._db()
+            removed += conn.execute("DELETE FROM serp_cache WHERE fetched_at < ?", (time.time() - max_ttl,)).rowcount
+            cap = settings.SERP_CACHE_MAX_MB * 1024 * 1024
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM serp_cache").fetchone()[0]
+            if cap > 0 and total > cap:
+                doomed = []
+                for key, size in conn.execute("SELECT key, size FROM serp_cache ORDER BY fetched_at"):
+                    if total <= cap:
+                        break
+                    doomed.append((key,))
+                    total -= size
+                conn.executemany("DELETE FROM serp_cache WHERE key=?", doomed)
+                removed += len(doomed)
+            conn.commit()
+        return removed
+
+
+serp_cache = SerpCache()
@@ -4,6 +4,7 @@ from typing import List
 
 class Settings(BaseSettings):
     SERPAPI_KEY: str = ""
+    SERP_BASE: str = "https://serpapi.com/search.json"
     QUERY_TITLES: List[str] = Field(default_factory=lambda: [
         "Chief Data Officer","VP Data Science","VP Analytics",
         "Head of Data","Director Analytics","Director Marketing Analytics"
@@ -12,33 +13,83 @@ class Settings(BaseSettings):
     LOCATIONS: List[str] = ["Remote","Chicago, IL, USA","Illinois"]
     REMOTE_ONLY: bool = False
     MAX_RESULTS: int = 50
+    SERP_CONCURRENCY: int = 4
+    SERP_RATE_PER_SEC: float = 1.0
+    SERP_BURST: int = 4
+    SERP_CACHE_TTL_GOOGLE_SECS: int = 3600
+    SERP_CACHE_TTL_LINKEDIN_SECS: int = 3600
+    SERP_CACHE_MAX_MB: int = 100
+    SERP_CACHE_OFFLINE: bool = False
+    ENABLE_QUERY_PLANNER: bool = True
+    SERP_DAILY_CREDIT_BUDGET: int = 0  # SerpAPI requests per day (TZ); 0 = unlimited
+    PLANNER_BACKOFF_BASE_HOURS: float = 12.0  # wait after a shard's first run without new jobs; doubles per dry run
+    PLANNER_BACKOFF_MAX_HOURS: float = 168.0
 
     ENABLE_ASSESSMENT_FILTER: bool = False
     ENABLE_ASSESSMENT_BOOST: bool = True
+    # "term:weight" sets a weight (default 1); a leading "-" marks a term that vetoes the match.
     ASSESSMENT_TERMS: List[str] = [
         "assessment","aptitude","cognitive","reasoning test","case study",
-        "business case","analytical exercise","situational judgment","evaluation","challenge"
+        "business case","analytical exercise","situational judgment","evaluation:0.5","challenge:0.5"
     ]
+    ASSESSMENT_MIN_WEIGHT: float = 1.0
     ASSESSMENT_SCORE_BOOST: float = 15.0
+    SENIOR_TERMS: List[str] = [
+        "chief","vp","vice president","svp","evp","director","head","lead","principal",
+        "-intern","-internship","-junior","-entry level","-entry-level",
+    ]
+
+    CANDIDATE_PROFILE: str = (
+        "- 17+ years leading data science, analytics, marketing analytics (CDP, identity graph), cloud platforms, BI.\n"
+        "- Seeks roles like CDO, VP/Director of Data/Analytics, Head of Data, Data Strategy/Transformation."
+    )
+    ENABLE_PRERANK: bool = True
+    PRERANK_TOP_K: int = 30  # LLM-scored jobs per run (per worker); 0 = no cap
+    PRERANK_MIN_SIMILARITY: float = 0.0
+    ENABLE_NEAR_DEDUP: bool = True
+    DEDUP_MAX_DISTANCE: int = 3  # SimHash bits; <= 3 keeps LSH lookups exact
+    DEDUP_WINDOW_DAYS: int = 30  # only link to canonical jobs stored this recently; 0 = no limit
 
     ENABLE_FOLLOW_LINK: bool = True
     HTTP_TIMEOUT_SECS: int = 18
     MAX_HTML_CHARS: int = 120000
+    SCRAPE_CONCURRENCY: int = 8
+    SCRAPE_PER_HOST_LIMIT: int = 2
 
     OPENAI_API_KEY: str = ""
     OPENROUTER_API_KEY: str = ""
     LLM_API_BASE: str = ""
     LLM_API_KEY: str = ""
     LLM_MODEL: str = "gpt-4o-mini"
+    LLM_SCORE_MODE: str = "single"  # single|batch|concurrent
+    LLM_BATCH_SIZE: int = 5
+    LLM_CONCURRENCY: int = 4
+    LLM_RUN_TOKEN_BUDGET: int = 0
+    LLM_RUN_COST_BUDGET: float = 0.0
+    LLM_COST_PER_1K_TOKENS: float = 0.0
+    LLM_CACHE_TTL_DAYS: int = 30
+    LLM_CACHE_MAX_ROWS: int = 50000
+    RESCORE_CHUNK_SIZE: int = 100  # jobs read, scored and written back per transaction by a rescore
 
     TELEGRAM_BOT_TOKEN: str = ""
     TELEGRAM_CHAT_ID: str = ""
 
     OUTPUT_DIR: str = "/app/output"
     DB_PATH: str = "/app/data/jobs.db"
+    DB_WRITE_BATCH_SIZE: int = 500
+    EXPORT_BATCH_SIZE: int = 5000  # rows fetched per chunk by /export; one Parquet row group each
+    DESCRIPTION_CODEC: str = "auto"  # auto|zstd|zlib|none; auto uses zstd when the zstandard package is installed
+    DESCRIPTION_COMPRESS_LEVEL: int = 0  # 0 = codec default (zstd 3, zlib 6)
 
     TZ: str = "America/Chicago"
     SCHEDULE_CRONS: List[str] = Field(default_factory=lambda: ["40 7 * * *"])
+    RUN_HEARTBEAT_SECS: int = 10
+    RUN_STALE_SECS: int = 600
+    RUN_RESUME_WINDOW_SECS: int = 21600
+    SHARD_LEASE_SECS: int = 120  # a worker's claim on a shard; extended by its heartbeat
+    SHARD_MAX_ATTEMPTS: int = 3
+    WORKER_POLL_SECS: int = 15  # how often a process looks for runs to join; 0 = only work on runs it starts
+    LEADER_LEASE_SECS: int = 60  # cron is fired only by the process holding this lease
     JOB_STATUS_CHOICES: List[str] = Field(default_factory=lambda: [
         "harvested","researching","applied","interviewing","offer","rejected","archived"
     ])
@@ -57,6 +108,7 @@ class Settings(BaseSettings):
         "QUERY_KEYWORDS",
         "LOCATIONS",
         "ASSESSMENT_TERMS",
+        "SENIOR_TERMS",
         "SCHEDULE_CRONS",
         "JOB_STATUS_CHOICES",
         mode="before",
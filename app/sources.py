@@ -1,14 +1,70 @@
 import hashlib
 import re
-import requests
-from typing import List
-from dateutil import parser as dtparse
+import threading
+from contextlib import contextmanager
+from typing import Container, Iterator, List
 from .models import Job
+from .metrics import SERP_REQUESTS
+from .ratelimit import SharedTokenBucket
+from .serpcache import serp_cache
 from .settings import settings
 
-SERP_BASE = "https://serpapi.com/search.json"
 RELATIVE_DATE_PAT = re.compile(r"(\\d+)\\s*(day|hour|minute|week|month|year)s? ago", re.I)
 
+# Shared by every search thread, and through the database by every worker process, so concurrent runs stay
+# under the SerpAPI plan limit.
+_limiter = SharedTokenBucket("serpapi", settings.SERP_RATE_PER_SEC, settings.SERP_BURST)
+_usage = threading.local()
+
+
+class RequestUsage:
+    """SerpAPI requests (credits) and failed searches of one thread inside ``count_requests``."""
+
+    def __init__(self):
+        self.credits = 0
+        self.failures = 0
+
+
+@contextmanager
+def count_requests() -> Iterator[RequestUsage]:
+    """Count the SerpAPI requests (credits) the calling thread sends inside the block; cache hits are free.
+
+    Non-200 replies and a missing ``SERPAPI_KEY`` count as failures, so an outage is not mistaken for a search
+    that found nothing.
+    """
+    _usage.box = box = RequestUsage()
+    try:
+        yield box
+    finally:
+        _usage.box = None
+
+
+def _failed() -> None:
+    box = getattr(_usage, "box", None)
+    if box is not None:
+        box.failures += 1
+
+
+def _request(params: dict) -> dict | None:
+    _limiter.acquire()
+    SERP_REQUESTS.inc(engine=params.get("engine", ""))
+    box = getattr(_usage, "box", None)
+    if box is not None:
+        box.credits += 1
+    import requests
+    r = requests.get(settings.SERP_BASE, params=params, timeout=settings.HTTP_TIMEOUT_SECS)
+    if r.status_code != 200:
+        return None
+    return r.json()
+
+
+def _get(params: dict, ttl: int) -> dict | None:
+    data = serp_cache.fetch(params, ttl, lambda: _request(params))
+    # None is a non-200 reply (ours or a coalesced one), except in replay mode where it is just a cache miss.
+    if data is None and not settings.SERP_CACHE_OFFLINE:
+        _failed()
+    return data
+
 
 def _hash_id(s: str) -> str:
     return hashlib.sha256(s.encode("utf-8")).hexdigest()[:32]
@@ -17,6 +73,7 @@ def _hash_id(s: str) -> str:
 def _normalize_date(s: str | None) -> str:
     if not s:
         return ""
+    from dateutil import parser as dtparse
     try:
         return dtparse.parse(str(s)).isoformat()
     except Exception:
@@ -38,10 +95,48 @@ def _normalize_date(s: str | None) -> str:
     return (now - delta).isoformat()
 
 
+def _all_known(page: List[Job], known: Container[str] | None) -> bool:
+    return bool(known) and bool(page) and all(j.id in known for j in page)
+
+
+def _google_job(it: dict) -> Job:
+    title = (it.get("title") or "").strip()
+    company = (it.get("company_name") or "").strip()
+    loc = (it.get("location") or "").strip()
+    via = (it.get("via") or "").strip()
+    url = it.get("link") or (it.get("related_links", [{}])[0].get("link")) or ""
+    if not url:
+        apps = it.get("apply_options", [])
+        url = (apps and apps[0].get("link")) or ""
+    desc = (it.get("description") or "")[:2000]
+    posted_iso = _normalize_date((it.get("detected_extensions", {}) or {}).get("posted_at"))
+    salary = (it.get("detected_extensions", {}) or {}).get("salary", "")
+    uid = _hash_id(url or f"{title}-{company}-{loc}")
+    return Job(id=uid, title=title, company=company, location=loc, via=via,
+               posted_at=posted_iso, url=url, source="google_jobs",
+               description=desc, salary=salary)
+
+
+def _linkedin_job(it: dict) -> Job:
+    title = (it.get("title") or "").strip()
+    company = ((it.get("company") or {}).get("name") or "").strip()
+    loc = (it.get("location") or "").strip()
+    url = it.get("link") or ""
+    posted_iso = _normalize_date(it.get("listed_at", ""))
+    uid = _hash_id(url or f"{title}-{company}-{loc}")
+    return Job(id=uid, title=title, company=company, location=loc, via="LinkedIn",
+               posted_at=posted_iso, url=url, source="linkedin")
+
+
 class SerpGoogleJobs:
+    engine = "google_jobs"
+
     @staticmethod
-    def search(query: str, location: str, remote_only: bool, max_results: int) -> List[Job]:
-        if not settings.SERPAPI_KEY:
+    def search(query: str, location: str, remote_only: bool, max_results: int,
+               known: Container[str] | None = None) -> List[Job]:
+        """Follow ``next_page_token`` until ``max_results``, or stop after a page of only ``known`` IDs."""
+        if not (settings.SERPAPI_KEY or settings.SERP_CACHE_OFFLINE):
+            _failed()
             return []
         params = {
             "engine": "google_jobs",
@@ -51,34 +146,30 @@ class SerpGoogleJobs:
             "chips": "date_posted:week",
             "location": location,
         }
-        r = requests.get(SERP_BASE, params=params, timeout=settings.HTTP_TIMEOUT_SECS)
-        if r.status_code != 200:
-            return []
-        data = r.json()
-        results = []
-        for it in data.get("jobs_results", [])[:max_results]:
-            title = (it.get("title") or "").strip()
-            company = (it.get("company_name") or "").strip()
-            loc = (it.get("location") or "").strip()
-            via = (it.get("via") or "").strip()
-            url = it.get("link") or (it.get("related_links", [{}])[0].get("link")) or ""
-            if not url:
-                apps = it.get("apply_options", [])
-                url = (apps and apps[0].get("link")) or ""
-            desc = (it.get("description") or "")[:2000]
-            posted_iso = _normalize_date((it.get("detected_extensions", {}) or {}).get("posted_at"))
-            salary = (it.get("detected_extensions", {}) or {}).get("salary", "")
-            uid = _hash_id(url or f"{title}-{company}-{loc}")
-            results.append(Job(id=uid, title=title, company=company, location=loc, via=via,
-                               posted_at=posted_iso, url=url, source="google_jobs",
-                               description=desc, salary=salary))
-        return results
+        results: List[Job] = []
+        while len(results) < max_results:
+            data = _get(params, settings.SERP_CACHE_TTL_GOOGLE_SECS)
+            if data is None:
+                break
+            page = [_google_job(it) for it in data.get("jobs_results", [])]
+            results.extend(page)
+            token = (data.get("serpapi_pagination") or {}).get("next_page_token")
+            # Results are roughly newest-first, so a page we've already stored means the rest is old too.
+            if not page or not token or _all_known(page, known):
+                break
+            params = {**params, "next_page_token": token}
+        return results[:max_results]
 
 
 class SerpLinkedInJobs:
+    engine = "linkedin_jobs"
+
     @staticmethod
-    def search(query: str, location: str, remote_only: bool, max_results: int) -> List[Job]:
-        if not settings.SERPAPI_KEY:
+    def search(query: str, location: str, remote_only: bool, max_results: int,
+               known: Container[str] | None = None) -> List[Job]:
+        """Page through results with ``start`` until ``max_results``, or stop after a page of only ``known`` IDs."""
+        if not (settings.SERPAPI_KEY or settings.SERP_CACHE_OFFLINE):
+            _failed()
             return []
         params = {
             "engine": "linkedin_jobs",
@@ -89,18 +180,14 @@ class SerpLinkedInJobs:
         }
         # Clean None values
         params = {k: v for k, v in params.items() if v is not None}
-        r = requests.get(SERP_BASE, params=params, timeout=settings.HTTP_TIMEOUT_SECS)
-        if r.status_code != 200:
-            return []
-        data = r.json()
-        results = []
-        for it in data.get("jobs", [])[:max_results]:
-            title = (it.get("title") or "").strip()
-            company = ((it.get("company") or {}).get("name") or "").strip()
-            loc = (it.get("location") or "").strip()
-            url = it.get("link") or ""
-            posted_iso = _normalize_date(it.get("listed_at", ""))
-            uid = _hash_id(url or f"{title}-{company}-{loc}")
-            results.append(Job(id=uid, title=title, company=company, location=loc, via="LinkedIn",
-                               posted_at=posted_iso, url=url, source="linkedin"))
-        return results
+        results: List[Job] = []
+        while len(results) < max_results:
+            data = _get(params, settings.SERP_CACHE_TTL_LINKEDIN_SECS)
+            if data is None:
+                break
+            page = [_linkedin_job(it) for it in data.get("jobs", [])]
+            results.extend(page)
+            if not page or _all_known(page, known):
+                break
+            params = {**params, "start": len(results)}
+        return results[:max_results]
@@ -0,0 +1,69 @@
+"""Micro-benchmark: per-term substring scans vs. the compiled TermMatcher.
+
+    python -m bench.bench_matcher [--docs 500] [--terms 10]
+"""
+import argparse
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.matcher import TermMatcher  # noqa: E402
+from app.settings import settings  # noqa: E402
+
+WORDS = (
+    "we lead data strategy analytics platform team partner stakeholders cloud marketing identity graph "
+    "customer insight leading evaluation reporting governance modeling experimentation roadmap hiring"
+).split()
+
+
+def make_docs(n: int, size: int = 20000, seed: int = 7) -> list[str]:
+    rnd = random.Random(seed)
+    docs = []
+    for _ in range(n):
+        words, length = [], 0
+        while length < size:
+            w = rnd.choice(WORDS)
+            words.append(w)
+            length += len(w) + 1
+        docs.append(" ".join(words))
+    return docs
+
+
+def substring_scan(terms: list[str], docs: list[str]) -> int:
+    hits = 0
+    for d in docs:
+        low = d.lower()
+        hits += sum(1 for t in terms if t in low)
+    return hits
+
+
+def matcher_scan(matcher: TermMatcher, docs: list[str]) -> int:
+    return sum(len(matcher.scan(d).positive) for d in docs)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--docs", type=int, default=500)
+    ap.add_argument("--terms", type=int, default=0, help="pad the term list to this size (0 = settings as-is)")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    terms = list(settings.ASSESSMENT_TERMS)
+    while len(terms) < args.terms:
+        terms.append(f"filler term {len(terms)}")
+    plain = [t.split(":")[0].lstrip("-").lower() for t in terms]
+    docs = make_docs(args.docs)
+    matcher = TermMatcher(terms)
+
+    for name, fn in (("substring", lambda: substring_scan(plain, docs)),
+                     ("matcher", lambda: matcher_scan(matcher, docs))):
+        best = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        print(f"{name:10s} {len(terms):4d} terms  {args.docs} docs x 20KB  {best * 1000:8.1f} ms  "
+              f"{args.docs / best:8.0f} docs/s  hits={fn()}")
+
+
+if __name__ == "__main__":
+    main()
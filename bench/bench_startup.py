@@ -0,0 +1,128 @@
+"""Startup benchmark: import time of each entry point and time until a fresh server answers /health.
+
+    python -m bench.bench_startup [--repeat 5]
+    python -m bench.bench_startup --json out.json                              # save results
+    python -m bench.bench_startup --baseline out.json --max-regression 0.25    # exit 1 if anything got slower
+
+Every sample runs in a new interpreter against an empty database in a temporary directory, so nothing is
+cached between samples. Each import sample also lists which heavy dependencies the import pulled in. None
+should appear there, because openai, bs4/lxml, requests, numpy, dateutil and apscheduler are only loaded on
+the code paths that use them.
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+TARGETS = {"cli": "app.cli", "api": "app.api", "main": "main"}
+HEAVY = ("openai", "bs4", "lxml", "requests", "numpy", "dateutil", "apscheduler")
+PROBE = """
+import json, sys, time
+t = time.perf_counter()
+import {module}
+secs = time.perf_counter() - t
+print(json.dumps({{"secs": secs, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--no-server", action="store_true", help="skip the uvicorn time-to-/health measurement")
+    ap.add_argument("--json", help="write results to this file")
+    ap.add_argument("--baseline", help="compare against a previous --json file")
+    ap.add_argument("--max-regression", type=float, default=0.25)
+    return ap.parse_args(argv)
+
+
+def _env(workdir: str) -> dict:
+    return {**os.environ, "DB_PATH": os.path.join(workdir, "jobs.db"), "OUTPUT_DIR": os.path.join(workdir, "out"),
+            "PYTHONDONTWRITEBYTECODE": "1"}
+
+
+def time_import(module: str, workdir: str) -> dict:
+    out = subprocess.run([sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY)], cwd=ROOT,
+                         env=_env(workdir), capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_health(workdir: str, timeout: float = 30.0) -> float:
+    port = _free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level",
+                             "warning"], cwd=ROOT, env=_env(workdir),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as resp:
+                    if resp.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.02)
+        raise RuntimeError(f"server did not answer /health within {timeout:.0f}s")
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def median(xs):
+    xs = sorted(xs)
+    return xs[len(xs) // 2] if xs else 0.0
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    samples: dict[str, list[float]] = {name: [] for name in TARGETS}
+    loaded: dict[str, list[str]] = {}
+    if not args.no_server:
+        samples["health"] = []
+    for _ in range(args.repeat):
+        for name, module in TARGETS.items():
+            with tempfile.TemporaryDirectory(prefix="harvest-startup-") as workdir:
+                res = time_import(module, workdir)
+            samples[name].append(res["secs"])
+            loaded[name] = res["loaded"]
+        if not args.no_server:
+            with tempfile.TemporaryDirectory(prefix="harvest-startup-") as workdir:
+                samples["health"].append(time_health(workdir))
+    summary = {name: median(xs) for name, xs in samples.items()}
+    print(f"{'target':<8} {'median s':>9} {'min s':>7}  heavy modules loaded")
+    for name, xs in samples.items():
+        what = "import " + TARGETS[name] if name in TARGETS else "uvicorn main:app until /health"
+        heavy = ", ".join(loaded.get(name, [])) or "-"
+        print(f"{name:<8} {summary[name]:9.3f} {min(xs):7.3f}  {heavy if name in TARGETS else ''}  ({what})")
+    if args.json:
+        Path(args.json).write_text(json.dumps({"config": vars(args), "summary": summary, "samples": samples,
+                                               "loaded": loaded}, indent=2))
+    if args.baseline:
+        base = json.loads(Path(args.baseline).read_text())["summary"]
+        failed = False
+        for name, secs in summary.items():
+            if not base.get(name):
+                continue
+            change = secs / base[name] - 1
+            print(f"baseline {name}: {base[name]:.3f} s -> {secs:.3f} s ({change:+.1%})")
+            if change > args.max_regression:
+                failed = True
+        if failed:
+            print(f"REGRESSION: startup got more than {args.max_regression:.0%} slower")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""Local stand-ins for SerpAPI, ATS job pages and an OpenAI-compatible LLM, used by ``bench.harness``.
+
+Payloads are deterministic: the same request always returns the same jobs, so runs are comparable.
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+TITLES = [
+    "Director of Analytics", "VP Data Science", "Head of Data", "Chief Data Officer", "Director Marketing Analytics",
+    "Principal Data Strategist", "VP Analytics", "Lead Data Platform Architect", "Head of Customer Insights",
+]
+WORDS = (
+    "we lead data strategy analytics platform team partner stakeholders cloud marketing identity graph customer "
+    "insight reporting governance modeling experimentation roadmap hiring personalization segmentation pipeline "
+    "warehouse dashboards forecasting budget vendor executive mentoring culture growth measurement attribution"
+).split()
+
+
+@dataclass
+class FakeConfig:
+    jobs_per_page: int = 10
+    pages: int = 3
+    dup_rate: float = 0.0  # share of LinkedIn results that mirror a Google Jobs result
+    serp_latency_ms: int = 0
+    page_kb: int = 40
+    page_latency_ms: int = 50
+    llm_latency_ms: int = 200
+
+
+def _h(*parts) -> int:
+    return int(hashlib.md5("|".join(map(str, parts)).encode()).hexdigest()[:8], 16)
+
+
+def _job(cfg: FakeConfig, ats: str, query: str, location: str, n: int, engine: str) -> dict:
+    mirror = engine == "linkedin_jobs" and (_h("dup", query, location, n) % 1000) < cfg.dup_rate * 1000
+    seed = _h("google_jobs" if mirror else engine, query, location, n)
+    return {
+        "title": f"{TITLES[seed % len(TITLES)]} {seed % 97}",
+        "company": f"Company {seed % 5003}",
+        "location": location,
+        "link": f"{ats}/job/{engine}/{seed}",
+    }
+
+
+def _serp_handler(cfg: FakeConfig, ats: str):
+    class Serp(BaseHTTPRequestHandler):
+        def log_message(self, *a):
+            pass
+
+        def do_GET(self):
+            q = {k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()}
+            time.sleep(cfg.serp_latency_ms / 1000)
+            engine = q.get("engine", "google_jobs")
+            query = q.get("q") or q.get("keywords", "")
+            location = q.get("location", "")
+            if engine == "google_jobs":
+                page = int(q.get("next_page_token", 0))
+                start = page * cfg.jobs_per_page
+                items = []
+                for n in range(start, start + cfg.jobs_per_page):
+                    j = _job(cfg, ats, query, location, n, engine)
+                    items.append({"title": j["title"], "company_name": j["company"], "location": j["location"],
+                                  "via": "Fake ATS", "link": j["link"], "description": " ".join(WORDS[:30]),
+                                  "detected_extensions": {"posted_at": f"{n % 6 + 1} days ago"}})
+                body = {"jobs_results": items}
+                if page + 1 < cfg.pages:
+                    body["serpapi_pagination"] = {"next_page_token": str(page + 1)}
+            else:
+                start = int(q.get("start", 0))
+                end = min(start + cfg.jobs_per_page, cfg.jobs_per_page * cfg.pages)
+                items = []
+                for n in range(start, end):
+                    j = _job(cfg, ats, query, location, n, engine)
+                    items.append({"title": j["title"], "company": {"name": j["company"]}, "location": j["location"],
+                                  "link": j["link"].replace("/google_jobs/", "/linkedin/"),
+                                  "listed_at": f"{n % 6 + 1} days ago"})
+                body = {"jobs": items}
+            data = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Serp
+
+
+def _ats_handler(cfg: FakeConfig):
+    class Ats(BaseHTTPRequestHandler):
+        def log_message(self, *a):
+            pass
+
+        def do_GET(self):
+            time.sleep(cfg.page_latency_ms / 1000)
+            seed = _h(self.path.replace("/linkedin/", "/google_jobs/"))
+            words, size, i = [], 0, seed
+            while size < cfg.page_kb * 1024:
+                w = WORDS[i % len(WORDS)]
+                words.append(w)
+                size += len(w) + 1
+                i = (i * 1103515245 + 12345) & 0x7FFFFFFF
+            para = " ".join(words)
+            html = (f"<html><head><script>var x = 1;</script></head><body><nav>menu</nav><h1>{self.path}</h1>"
+                    f"<p>{para}</p><p>Our process includes a case study.</p><footer>f</footer></body></html>").encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(html)))
+            self.end_headers()
+            self.wfile.write(html)
+
+    return Ats
+
+
+def _llm_handler(cfg: FakeConfig):
+    class Llm(BaseHTTPRequestHandler):
+        def log_message(self, *a):
+            pass
+
+        def do_POST(self):
+            req = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            prompt = req["messages"][-1]["content"]
+            time.sleep(cfg.llm_latency_ms / 1000)
+            if "JSON array" in prompt:
+                idx = sorted({int(x) for x in re.findall(r'"i": (\d+)', prompt)})
+                content = json.dumps([{"i": i, "score": 60 + i % 30, "blurb": "Strong data leadership fit."} for i in idx])
+            else:
+                content = json.dumps({"score": 70 + len(prompt) % 25, "blurb": "Strong data leadership fit."})
+            prompt_tokens = len(prompt) // 4
+            data = json.dumps({
+                "id": "bench", "object": "chat.completion", "created": 0, "model": req.get("model", "bench"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": 40, "total_tokens": prompt_tokens + 40},
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Llm
+
+
+def _serve(handler) -> tuple[ThreadingHTTPServer, str]:
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    srv.daemon_threads = True
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, f"http://127.0.0.1:{srv.server_address[1]}"
+
+
+def start(cfg: FakeConfig) -> dict:
+    """Start all three servers in this process and return their base URLs."""
+    _, ats = _serve(_ats_handler(cfg))
+    _, serp = _serve(_serp_handler(cfg, ats))
+    _, llm = _serve(_llm_handler(cfg))
+    return {"serp": f"{serp}/search.json", "ats": ats, "llm": f"{llm}/v1"}
+
+
+def serve_forever(cfg: FakeConfig, urls_queue) -> None:
+    """Entry point for running the fakes in a child process, so they don't share the harvester's GIL."""
+    urls_queue.put(start(cfg))
+    threading.Event().wait()
@@ -0,0 +1,178 @@
+"""Offline end-to-end benchmark: drives ``Runner.run_once`` against local fakes and reports throughput.
+
+    python -m bench.harness --runs 3 --titles 3 --locations 2 --pages 3 --page-latency-ms 50
+    python -m bench.harness --json out.json                 # save results
+    python -m bench.harness --baseline out.json --max-regression 0.15   # exit 1 on a >15% jobs/sec drop
+
+No SerpAPI credits or LLM tokens are spent: SERP_BASE and LLM_API_BASE point at ``bench.fakes``, which
+run in a child process. Every run starts from an empty database, so each one is a full first-time harvest.
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from bench.fakes import FakeConfig, serve_forever  # noqa: E402
+
+STAGES = ("search", "dedup", "near_dup", "scrape", "detect", "score", "persist")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--titles", type=int, default=3, help="number of QUERY_TITLES")
+    ap.add_argument("--locations", type=int, default=2)
+    ap.add_argument("--jobs-per-page", type=int, default=10)
+    ap.add_argument("--pages", type=int, default=3)
+    ap.add_argument("--max-results", type=int, default=30)
+    ap.add_argument("--dup-rate", type=float, default=0.2)
+    ap.add_argument("--serp-latency-ms", type=int, default=100)
+    ap.add_argument("--page-kb", type=int, default=40)
+    ap.add_argument("--page-latency-ms", type=int, default=50)
+    ap.add_argument("--llm-latency-ms", type=int, default=200)
+    ap.add_argument("--llm-mode", default="concurrent", choices=["single", "batch", "concurrent"])
+    ap.add_argument("--no-memory", action="store_true", help="skip the extra tracemalloc run")
+    ap.add_argument("--json", help="write results to this file")
+    ap.add_argument("--baseline", help="compare jobs/sec against a previous --json file")
+    ap.add_argument("--max-regression", type=float, default=0.2)
+    ap.add_argument("--verbose", action="store_true", help="show the harvester's own output")
+    return ap.parse_args(argv)
+
+
+def start_fakes(cfg: FakeConfig) -> tuple[mp.Process, dict]:
+    q = mp.Queue()
+    proc = mp.Process(target=serve_forever, args=(cfg, q), daemon=True)
+    proc.start()
+    return proc, q.get(timeout=10)
+
+
+def configure_env(args: argparse.Namespace, urls: dict, workdir: str) -> None:
+    # Must run before anything imports app.settings.
+    titles = ["Director Analytics", "VP Data Science", "Head of Data", "Chief Data Officer", "VP Analytics",
+              "Director Marketing Analytics"] * 4
+    cities = ["Remote", "Chicago, IL", "New York, NY", "Austin, TX", "Seattle, WA", "Denver, CO"] * 4
+    os.environ.update({
+        "SERPAPI_KEY": "bench",
+        "SERP_BASE": urls["serp"],
+        "LLM_API_BASE": urls["llm"],
+        "LLM_API_KEY": "bench",
+        "LLM_SCORE_MODE": args.llm_mode,
+        "QUERY_TITLES": json.dumps(titles[:args.titles]),
+        "QUERY_KEYWORDS": "[]",
+        "LOCATIONS": json.dumps(cities[:args.locations]),
+        "MAX_RESULTS": str(args.max_results),
+        "SERP_RATE_PER_SEC": "0",
+        "SERP_CACHE_TTL_GOOGLE_SECS": "0",
+        "SERP_CACHE_TTL_LINKEDIN_SECS": "0",
+        "DB_PATH": os.path.join(workdir, "run0", "jobs.db"),
+        "OUTPUT_DIR": os.path.join(workdir, "out"),
+    })
+
+
+def one_run(workdir: str, i: int, verbose: bool, memory: bool = False) -> dict:
+    from app.harvest import Runner
+    from app.metrics import REGISTRY
+    from app.serpcache import serp_cache
+    from app.settings import settings
+
+    settings.DB_PATH = os.path.join(workdir, f"run{i}", "jobs.db")
+    serp_cache._conn = None
+    runner = Runner()
+    before = REGISTRY.snapshot()
+    sink = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    with sink:
+        result = runner.run_once()
+    wall = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] if memory else None
+    if memory:
+        tracemalloc.stop()
+    after = REGISTRY.snapshot()
+
+    def delta(name: str) -> float:
+        return after.get(name, 0.0) - before.get(name, 0.0)
+
+    runner.store.conn.close()
+    return {
+        "wall_secs": wall,
+        "inserted": result["inserted"],
+        "near_duplicates": result.get("near_duplicates", 0),
+        "jobs_per_sec": result["inserted"] / wall if wall else 0.0,
+        "serp_requests": sum(delta(k) for k in after if k.startswith("harvest_serp_requests_total")),
+        "pages_scraped": sum(delta(k) for k in after if k.startswith("harvest_scrape_pages_total")),
+        "llm_calls": sum(delta(k) for k in after if k.startswith("harvest_llm_seconds_count")),
+        "llm_tokens": result.get("llm_tokens", 0),
+        "stage_secs": {s: delta(f'harvest_stage_seconds_sum{{stage="{s}"}}') for s in STAGES},
+        "peak_mem_mb": peak / 2**20 if peak is not None else None,
+    }
+
+
+def summarize(runs: list[dict]) -> dict:
+    def median(xs):
+        xs = sorted(xs)
+        return xs[len(xs) // 2] if xs else 0.0
+
+    return {
+        "runs": len(runs),
+        "wall_secs": median([r["wall_secs"] for r in runs]),
+        "jobs_per_sec": median([r["jobs_per_sec"] for r in runs]),
+        "inserted": median([r["inserted"] for r in runs]),
+        "stage_secs": {s: median([r["stage_secs"][s] for r in runs]) for s in STAGES},
+    }
+
+
+def report(args: argparse.Namespace, runs: list[dict], summary: dict, mem: dict | None) -> None:
+    print(f"{'run':>4} {'wall s':>8} {'jobs':>6} {'jobs/s':>8} {'serp':>6} {'pages':>6} {'llm':>5} {'dups':>5}")
+    for i, r in enumerate(runs, 1):
+        print(f"{i:>4} {r['wall_secs']:8.2f} {r['inserted']:6d} {r['jobs_per_sec']:8.1f} {int(r['serp_requests']):6d} "
+              f"{int(r['pages_scraped']):6d} {int(r['llm_calls']):5d} {r['near_duplicates']:5d}")
+    print(f"\nmedian of {summary['runs']}: {summary['jobs_per_sec']:.1f} jobs/s, {summary['wall_secs']:.2f} s wall")
+    print("stage time (own work per run, median):")
+    for s in STAGES:
+        print(f"  {s:9s} {summary['stage_secs'][s]:8.3f} s")
+    if mem:
+        print(f"peak traced memory: {mem['peak_mem_mb']:.1f} MB (separate tracemalloc run, {mem['wall_secs']:.2f} s)")
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    cfg = FakeConfig(jobs_per_page=args.jobs_per_page, pages=args.pages, dup_rate=args.dup_rate,
+                     serp_latency_ms=args.serp_latency_ms, page_kb=args.page_kb,
+                     page_latency_ms=args.page_latency_ms, llm_latency_ms=args.llm_latency_ms)
+    proc, urls = start_fakes(cfg)
+    try:
+        with tempfile.TemporaryDirectory(prefix="harvest-bench-") as workdir:
+            configure_env(args, urls, workdir)
+            runs = [one_run(workdir, i, args.verbose) for i in range(args.runs)]
+            mem = None if args.no_memory else one_run(workdir, args.runs, args.verbose, memory=True)
+    finally:
+        proc.terminate()
+    summary = summarize(runs)
+    report(args, runs, summary, mem)
+    out = {"config": vars(args), "summary": summary, "runs": runs,
+           "peak_mem_mb": mem["peak_mem_mb"] if mem else None}
+    if args.json:
+        Path(args.json).write_text(json.dumps(out, indent=2))
+    if args.baseline:
+        base = json.loads(Path(args.baseline).read_text())["summary"]["jobs_per_sec"]
+        drop = 1 - summary["jobs_per_sec"] / base if base else 0.0
+        print(f"baseline {base:.1f} jobs/s -> {summary['jobs_per_sec']:.1f} jobs/s ({-drop:+.1%})")
+        if drop > args.max_regression:
+            print(f"REGRESSION: throughput dropped more than {args.max_regression:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,17 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.api import app as api_app
-from app.scheduler import start_scheduler
 
-# Mount API and start scheduler
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Start the scheduler and join runs started by other workers once the server is up, not on import.
+    from app.runs import run_manager
+    from app.scheduler import start_scheduler
+    start_scheduler()
+    run_manager.start_worker()
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
 app.mount("/", api_app)
-start_scheduler()